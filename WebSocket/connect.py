@@ -1,10 +1,10 @@
-import boto3
-import os
 import json
+from lambdas import db
+from WebSocket.notify import expires_at
+from lambdas.auth import verify_token, AuthError
+from lambdas.metrics import instrumentar
 
-ddb = boto3.resource("dynamodb")
-table = ddb.Table(os.environ["SOCKET_TABLE"])
-
+@instrumentar
 def handler(event, context):
     """
     Maneja las conexiones WebSocket y guarda la info en DynamoDB
@@ -15,43 +15,36 @@ def handler(event, context):
         # Obtener query string parameters
         query_params = event.get("queryStringParameters") or {}
         
-        user_id = query_params.get("user_id")
-        rol = query_params.get("rol")
-        token = query_params.get("token")  # opcional
-        
+        token = query_params.get("token")
+
         print(f"Nueva conexión: {connection_id}")
-        print(f"Query params: {query_params}")
-        print(f"user_id: {user_id}, rol: {rol}")
-        
-        # Validar que user_id y rol existan
-        if not user_id:
-            print("❌ Error: user_id es requerido")
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"message": "user_id es requerido"})
-            }
-        
-        if not rol:
-            print("❌ Error: rol es requerido")
+
+        # Validar el JWT: user_id y rol se toman de los claims, no de la URL
+        try:
+            claims = verify_token(token)
+        except AuthError as e:
+            print(f"❌ Error: {e.message}")
             return {
-                "statusCode": 400,
-                "body": json.dumps({"message": "rol es requerido"})
+                "statusCode": e.status,
+                "body": json.dumps({"message": e.message})
             }
-        
+
+        user_id = claims["user_id"]
+        rol = claims["rol"]
+        print(f"user_id: {user_id}, rol: {rol}")
+
         # Guardar conexión en DynamoDB
+        # user_id y rol son las claves de los GSI ConnectionsByUser y ConnectionsByRol
         item = {
             "connectionId": connection_id,
             "user_id": user_id,
             "rol": rol,
-            "connected_at": event["requestContext"]["requestTimeEpoch"]
+            "connected_at": event["requestContext"]["requestTimeEpoch"],
+            # TTL: la fila se borra sola si el cliente deja de enviar heartbeat
+            "expires_at": expires_at()
         }
         
-        # Si hay token, validarlo (opcional)
-        if token:
-            item["token"] = token
-            # Aquí podrías validar el JWT si quieres
-        
-        table.put_item(Item=item)
+        db.sockets_table().put_item(Item=item)
         
         print(f"✅ Conexión guardada: {item}")
         
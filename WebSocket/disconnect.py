@@ -1,13 +1,11 @@
-import boto3
-import os
-
-dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table(os.environ["SOCKET_TABLE"])
+from lambdas import db
+from lambdas.metrics import instrumentar
 
+@instrumentar
 def handler(event, context):
     connection_id = event["requestContext"]["connectionId"]
 
     # Eliminar la conexión
-    table.delete_item(Key={"connectionId": connection_id})
+    db.sockets_table().delete_item(Key={"connectionId": connection_id})
 
     return {"statusCode": 200}
@@ -0,0 +1,27 @@
+import json
+from lambdas import db
+from lambdas.metrics import instrumentar
+from WebSocket.notify import expires_at
+
+@instrumentar
+def handler(event, context):
+    """
+    Ruta "heartbeat": el cliente la llama periódicamente y se extiende
+    el expires_at (TTL) de su conexión.
+    """
+    connection_id = event["requestContext"]["connectionId"]
+    try:
+        db.sockets_table().update_item(
+            Key={"connectionId": connection_id},
+            UpdateExpression="SET expires_at = :exp",
+            # No recrear filas ya borradas por $disconnect o el barrido
+            ConditionExpression="attribute_exists(connectionId)",
+            ExpressionAttributeValues={":exp": expires_at()}
+        )
+    except db.ddb_client().exceptions.ConditionalCheckFailedException:
+        return {"statusCode": 410, "body": json.dumps({"message": "Conexión desconocida"})}
+    except Exception as e:
+        print(f"❌ Error en heartbeat: {str(e)}")
+        return {"statusCode": 500, "body": json.dumps({"error": str(e)})}
+
+    return {"statusCode": 200}
@@ -0,0 +1,149 @@
+# Mensajes WebSocket de incidentes. Los usan tanto los handlers (notificación
+# síncrona) como el consumidor del stream, para que ambos envíen lo mismo.
+
+INCIDENT_TYPE_LABELS = {
+    'infrastructure': 'Infraestructura',
+    'electric_failure': 'Falla Eléctrica',
+    'water_failure': 'Falla de Agua',
+    'security': 'Seguridad',
+    'cleaning': 'Limpieza',
+    'technology': 'Tecnología',
+    'other': 'Otro'
+}
+
+STATUS_LABELS = {
+    'pending': 'Pendiente',
+    'in_progress': 'En Atención',
+    'completed': 'Resuelto',
+    'rejected': 'Rechazado'
+}
+
+FIELD_LABELS = {
+    'type': 'tipo',
+    'description': 'descripción',
+    'floor': 'piso',
+    'ambient': 'ambiente',
+    'urgency': 'urgencia'
+}
+
+
+def type_label(incident):
+    return INCIDENT_TYPE_LABELS.get(incident.get("type"), "Incidente")
+
+
+def nuevo_incidente(incident):
+    # Para administradores
+    return {
+        "tipo": "nuevo_incidente",
+        "incident_id": incident["incident_id"],
+        "tipo_incidente": type_label(incident),
+        "descripcion": incident.get("description"),
+        "urgencia": incident.get("urgency"),
+        "estado": incident.get("status"),
+        "piso": incident.get("floor"),
+        "ambiente": incident.get("ambient"),
+        "reportado_por": incident.get("reported_by_name")
+    }
+
+
+def estado_cambiado(incident, old_status, new_status, by, timestamp):
+    # Para Personal administrativo
+    return {
+        "tipo": "estado_cambiado",
+        "incident_id": incident["incident_id"],
+        "tipo_incidente": type_label(incident),
+        "piso": incident.get("floor"),
+        "ambiente": incident.get("ambient"),
+        "estado_anterior": old_status,
+        "nuevo_estado": new_status,
+        "actualizado_por": by,
+        "timestamp": timestamp
+    }
+
+
+def actualizacion_incidente(incident, new_status, timestamp):
+    # Para el estudiante que reportó
+    return {
+        "tipo": "actualizacion_incidente",
+        "incident_id": incident["incident_id"],
+        "tipo_incidente": type_label(incident),
+        "mensaje": "Tu incidente ha cambiado de estado",
+        "nuevo_estado": new_status,
+        "nuevo_estado_label": STATUS_LABELS.get(new_status, new_status),
+        "timestamp": timestamp
+    }
+
+
+def incidente_editado(incident, updated_fields, timestamp):
+    # Para el estudiante que reportó; `incident` es la versión ya editada
+    return {
+        "tipo": "incidente_editado",
+        "incident_id": incident["incident_id"],
+        "tipo_incidente": type_label(incident),
+        "piso": incident.get("floor"),
+        "ambiente": incident.get("ambient"),
+        "mensaje": "Un administrador ha actualizado tu incidente",
+        "campos_actualizados": updated_fields,
+        "campos_actualizados_labels": [FIELD_LABELS.get(f, f) for f in updated_fields],
+        "timestamp": timestamp
+    }
+
+
+def reportes_adicionales(incident, reported_by_name, timestamp):
+    # Para administradores: el mismo problema fue reportado otra vez.
+    # Se envía agregado (ver duplicates.should_notify), no por cada reporte
+    return {
+        "tipo": "reportes_adicionales",
+        "incident_id": incident["incident_id"],
+        "tipo_incidente": type_label(incident),
+        "urgencia": incident.get("urgency"),
+        "estado": incident.get("status"),
+        "piso": incident.get("floor"),
+        "ambiente": incident.get("ambient"),
+        "total_reportes": int(incident.get("report_count", 1)),
+        "ultimo_reporte_por": reported_by_name,
+        "timestamp": timestamp
+    }
+
+
+def has_reporter(incident):
+    created_by = incident.get("created_by")
+    return bool(created_by) and created_by != "unknown"
+
+
+def _resumen(incident):
+    return {
+        "incident_id": incident["incident_id"],
+        "tipo_incidente": type_label(incident),
+        "piso": incident.get("floor"),
+        "ambiente": incident.get("ambient")
+    }
+
+
+def estados_cambiados(changes, new_status, by, timestamp):
+    # Para Personal administrativo: un solo aviso por lote.
+    # `changes` es una lista de (incident, old_status)
+    return {
+        "tipo": "estados_cambiados",
+        "nuevo_estado": new_status,
+        "actualizado_por": by,
+        "total": len(changes),
+        "incidentes": [
+            {**_resumen(incident), "estado_anterior": old_status}
+            for incident, old_status in changes
+        ],
+        "timestamp": timestamp
+    }
+
+
+def actualizacion_incidentes(incidents, new_status, timestamp):
+    # Para un estudiante con varios incidentes en el mismo lote
+    return {
+        "tipo": "actualizacion_incidentes",
+        "mensaje": "Varios de tus incidentes han cambiado de estado",
+        "nuevo_estado": new_status,
+        "nuevo_estado_label": STATUS_LABELS.get(new_status, new_status),
+        "total": len(incidents),
+        "incidentes": [_resumen(incident) for incident in incidents],
+        "timestamp": timestamp
+    }
@@ -1,35 +1,233 @@
-import boto3
-import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from lambdas import db
+from lambdas.utils import dumps
 
-ddb = boto3.resource("dynamodb")
-table = ddb.Table(os.environ["SOCKET_TABLE"])
+# Envíos simultáneos a API Gateway y timeout por envío (segundos)
+FANOUT_MAX_WORKERS = int(os.environ.get("FANOUT_MAX_WORKERS", "16"))
+FANOUT_SEND_TIMEOUT = float(os.environ.get("FANOUT_SEND_TIMEOUT", "3"))
+FANOUT_MAX_RETRIES = 3
+# Si está activo, los handlers no notifican: lo hace WebSocket/stream_notify.py
+NOTIFY_VIA_STREAM = os.environ.get("NOTIFY_VIA_STREAM", "false").lower() == "true"
+ADMIN_ROLES = ["Personal administrativo", "Autoridad"]
+# Vida de una fila de conexión sin heartbeat (TTL de DynamoDB sobre expires_at)
+CONNECTION_TTL_SECONDS = int(os.environ.get("CONNECTION_TTL_SECONDS", "900"))
+THROTTLING_ERRORS = {"LimitExceededException", "ThrottlingException", "TooManyRequestsException"}
 
-# Crear el cliente de API Gateway 
-api_gateway = boto3.client(
-    "apigatewaymanagementapi",
-    endpoint_url=os.environ["WEBSOCKET_ENDPOINT"]
-)
+# Los reintentos por throttling se manejan en _send; el pool cubre todos los hilos
+API_GATEWAY_CONFIG = {
+    "connect_timeout": FANOUT_SEND_TIMEOUT,
+    "read_timeout": FANOUT_SEND_TIMEOUT,
+    "max_pool_connections": FANOUT_MAX_WORKERS,
+    "retries": {"mode": "standard", "max_attempts": 1}
+}
 
-def notify_role(message, rol_objetivo):
+
+def api_gateway():
+    # Cliente de API Gateway, creado la primera vez que se notifica
+    return db.client(
+        "apigatewaymanagementapi",
+        endpoint_url=os.environ["WEBSOCKET_ENDPOINT"],
+        config=API_GATEWAY_CONFIG
+    )
+
+# El pool vive lo mismo que el contenedor y se reutiliza entre invocaciones.
+# Se crea con el primer envío: los handlers que no notifican no lo pagan.
+_executor = None
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=FANOUT_MAX_WORKERS)
+    return _executor
+
+
+def _send(connection_id, data):
+    """
+    Envía el payload ya serializado a una conexión.
+    Devuelve "ok", "gone" o "error".
+    """
+    from botocore.exceptions import ClientError
+    for attempt in range(FANOUT_MAX_RETRIES + 1):
+        try:
+            api_gateway().post_to_connection(Data=data, ConnectionId=connection_id)
+            return "ok"
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code == "GoneException":
+                return "gone"
+            if code in THROTTLING_ERRORS and attempt < FANOUT_MAX_RETRIES:
+                # Backoff exponencial: 50ms, 100ms, 200ms
+                time.sleep(0.05 * (2 ** attempt))
+                continue
+            print(f"✗ Error enviando a {connection_id}: {str(e)}")
+            return "error"
+        except Exception as e:
+            print(f"✗ Error enviando a {connection_id}: {str(e)}")
+            return "error"
+    return "error"
+
+
+def expires_at(now=None):
+    return int(now if now is not None else time.time()) + CONNECTION_TTL_SECONDS
+
+
+def remove_connections(connection_ids):
+    # Un solo batch_writer (BatchWriteItem de 25 en 25) para todas las conexiones muertas
+    if not connection_ids:
+        return
+    with db.sockets_table().batch_writer() as batch:
+        for connection_id in connection_ids:
+            batch.delete_item(Key={"connectionId": connection_id})
+
+
+def _fan_out(message, connection_ids, destino):
+    """
+    Serializa el mensaje una vez y lo envía en paralelo a todas las conexiones.
+    Las conexiones que ya no existen se eliminan al final en lote.
+    """
+    connection_ids = list(dict.fromkeys(connection_ids))
+    if not connection_ids:
+        return {"ok": 0, "gone": 0, "error": 0}
+
+    data = dumps(message).encode()
+    results = list(_pool().map(lambda cid: _send(cid, data), connection_ids))
+
+    gone = [cid for cid, result in zip(connection_ids, results) if result == "gone"]
+    try:
+        remove_connections(gone)
+    except Exception as e:
+        print(f"Error eliminando conexiones: {str(e)}")
+
+    summary = {
+        "ok": results.count("ok"),
+        "gone": len(gone),
+        "error": results.count("error")
+    }
+    print(f"✓ Mensaje enviado a {destino}: {summary}")
+    return summary
+
+
+def _probe(connection_id):
+    """
+    Consulta una conexión con get_connection. Devuelve "ok", "gone" o "error".
+    """
+    from botocore.exceptions import ClientError
+    for attempt in range(FANOUT_MAX_RETRIES + 1):
+        try:
+            api_gateway().get_connection(ConnectionId=connection_id)
+            return "ok"
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code == "GoneException":
+                return "gone"
+            if code in THROTTLING_ERRORS and attempt < FANOUT_MAX_RETRIES:
+                time.sleep(0.05 * (2 ** attempt))
+                continue
+            return "error"
+        except Exception:
+            return "error"
+    return "error"
+
+
+def probe_connections(connection_ids):
+    # Estado de cada conexión, consultadas en paralelo con el pool del fan-out
+    return list(_pool().map(_probe, connection_ids))
+
+
+def _extend(connection_id, table_name, expires):
+    """
+    Extiende el expires_at de una conexión sin recrearla si ya se borró.
+    Devuelve "ok", "gone" o "error".
+    """
+    c = db.ddb_client()
     try:
-        resp = table.scan(
-            FilterExpression="rol = :r",
-            ExpressionAttributeValues={":r": rol_objetivo}
+        c.update_item(
+            TableName=table_name,
+            Key={"connectionId": connection_id},
+            UpdateExpression="SET expires_at = :exp",
+            ConditionExpression="attribute_exists(connectionId)",
+            ExpressionAttributeValues={":exp": expires}
         )
+        return "ok"
+    except c.exceptions.ConditionalCheckFailedException:
+        return "gone"
+    except Exception as e:
+        print(f"Error renovando {connection_id}: {str(e)}")
+        return "error"
+
+
+def extend_connections(connection_ids, expires):
+    # Renovaciones en paralelo con el pool del fan-out (cliente thread-safe)
+    table_name = db.sockets_table().name
+    return list(_pool().map(lambda cid: _extend(cid, table_name, expires), connection_ids))
+
+
+def _query_connection_ids(index_name, attribute, value):
+    # Query paginado sobre el GSI: costo proporcional a los destinatarios
+    from boto3.dynamodb.conditions import Key
+    from botocore.exceptions import ClientError
+    query_kwargs = {
+        "IndexName": index_name,
+        "KeyConditionExpression": Key(attribute).eq(value),
+        "ProjectionExpression": "connectionId"
+    }
+    connection_ids = []
+    while True:
+        try:
+            resp = db.sockets_table().query(**query_kwargs)
+        except ClientError as e:
+            # Stack a mitad de la migración (CONNECTION_INDEX_STAGE): el GSI aún no existe
+            # (DynamoDB lo informa como ValidationException)
+            code = e.response.get("Error", {}).get("Code")
+            if code not in ("ValidationException", "ResourceNotFoundException") or connection_ids:
+                raise
+            return _scan_connection_ids(attribute, value)
+        connection_ids.extend(item["connectionId"] for item in resp.get("Items", []))
+        if "LastEvaluatedKey" not in resp:
+            return connection_ids
+        query_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+def _scan_connection_ids(attribute, value):
+    from boto3.dynamodb.conditions import Attr
+    scan_kwargs = {
+        "FilterExpression": Attr(attribute).eq(value),
+        "ProjectionExpression": "connectionId"
+    }
+    connection_ids = []
+    while True:
+        resp = db.sockets_table().scan(**scan_kwargs)
+        connection_ids.extend(item["connectionId"] for item in resp.get("Items", []))
+        if "LastEvaluatedKey" not in resp:
+            return connection_ids
+        scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+def _connections_by_role(rol_objetivo):
+    return _query_connection_ids("ConnectionsByRol", "rol", rol_objetivo)
+
+
+def _connections_by_user(user_id_target):
+    return _query_connection_ids("ConnectionsByUser", "user_id", user_id_target)
+
 
-        for item in resp.get("Items", []):
-            connection_id = item["connectionId"]
-            try:
-                api_gateway.post_to_connection(
-                    Data=json.dumps(message),
-                    ConnectionId=connection_id
-                )
-                print(f"✓ Mensaje enviado a conexión {connection_id} (rol: {rol_objetivo})")
-            except Exception as e:
-                print(f"✗ Error enviando a {connection_id}: {str(e)}")
-                # Si la conexión ya no existe, eliminarla de la tabla
-                table.delete_item(Key={"connectionId": connection_id})
+def _all_connections():
+    scan_kwargs = {"ProjectionExpression": "connectionId"}
+    connection_ids = []
+    while True:
+        resp = db.sockets_table().scan(**scan_kwargs)
+        connection_ids.extend(item["connectionId"] for item in resp.get("Items", []))
+        if "LastEvaluatedKey" not in resp:
+            return connection_ids
+        scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+def notify_role(message, rol_objetivo):
+    try:
+        _fan_out(message, _connections_by_role(rol_objetivo), f"rol {rol_objetivo}")
     except Exception as e:
         print(f"Error en notify_role: {str(e)}")
 
@@ -37,44 +235,47 @@ def notify_role(message, rol_objetivo):
 def notify_user(message, user_id_target):
 
     try:
-        resp = table.scan(
-            FilterExpression="user_id = :u",
-            ExpressionAttributeValues={":u": user_id_target}
-        )
-
-        for item in resp.get("Items", []):
-            connection_id = item["connectionId"]
-            try:
-                api_gateway.post_to_connection(
-                    Data=json.dumps(message),
-                    ConnectionId=connection_id
-                )
-                print(f"✓ Mensaje enviado a usuario {user_id_target}")
-            except Exception as e:
-                print(f"✗ Error enviando a usuario {user_id_target}: {str(e)}")
-                table.delete_item(Key={"connectionId": connection_id})
+        _fan_out(message, _connections_by_user(user_id_target), f"usuario {user_id_target}")
     except Exception as e:
         print(f"Error en notify_user: {str(e)}")
 
 
 def notify_all(message):
     try:
-        resp = table.scan()
-
-        for item in resp.get("Items", []):
-            connection_id = item["connectionId"]
-            try:
-                api_gateway.post_to_connection(
-                    Data=json.dumps(message),
-                    ConnectionId=connection_id
-                )
-                print(f"✓ Mensaje broadcast enviado a {connection_id}")
-            except Exception as e:
-                print(f"✗ Error en broadcast a {connection_id}: {str(e)}")
-                table.delete_item(Key={"connectionId": connection_id})
+        _fan_out(message, _all_connections(), "todos")
     except Exception as e:
         print(f"Error en notify_all: {str(e)}")
 
 def notify_admins(message):
-    notify_role(message, "Personal administrativo")
-    notify_role(message, "Autoridad")
\ No newline at end of file
+    # Un solo fan-out para ambos roles administrativos
+    try:
+        _fan_out(message, _connections_for(("admins", None)), "administradores")
+    except Exception as e:
+        print(f"Error en notify_admins: {str(e)}")
+
+
+def _connections_for(target):
+    kind, value = target
+    if kind == "admins":
+        return [cid for rol in ADMIN_ROLES for cid in _connections_by_role(rol)]
+    if kind == "rol":
+        return _connections_by_role(value)
+    if kind == "usuario":
+        return _connections_by_user(value)
+    raise ValueError(f"Destino desconocido: {kind}")
+
+
+def deliver(deliveries):
+    """
+    Envía un lote de mensajes. `deliveries` es una lista de (destino, mensaje)
+    con destino ("admins", None), ("rol", rol) o ("usuario", user_id).
+    Las conexiones de cada destino se buscan una sola vez por lote.
+    """
+    connections = {}
+    for target, message in deliveries:
+        try:
+            if target not in connections:
+                connections[target] = _connections_for(target)
+            _fan_out(message, connections[target], f"{target[0]} {target[1] or ''}".strip())
+        except Exception as e:
+            print(f"Error en deliver {target}: {str(e)}")
@@ -0,0 +1,114 @@
+import sys
+import json
+import argparse
+from WebSocket import messages
+from WebSocket.notify import deliver
+from lambdas.duplicates import should_notify
+from lambdas.utils import json_default
+from lambdas.metrics import instrumentar
+
+# Se crea con el primer registro: importar boto3 no entra al arranque en frío
+_deserializer = None
+
+
+def _image(record, name):
+    image = record.get("dynamodb", {}).get(name)
+    if not image:
+        return None
+    global _deserializer
+    if _deserializer is None:
+        from boto3.dynamodb.types import TypeDeserializer
+        _deserializer = TypeDeserializer()
+    return {k: _deserializer.deserialize(v) for k, v in image.items()}
+
+
+def deliveries_for(record):
+    """
+    Deriva los mensajes de un registro del stream de incidentes a partir de
+    sus imágenes antigua y nueva. Devuelve una lista de (destino, mensaje).
+    """
+    event_name = record.get("eventName")
+    new = _image(record, "NewImage")
+    old = _image(record, "OldImage")
+
+    if event_name == "INSERT" and new:
+        return [(("admins", None), messages.nuevo_incidente(new))]
+
+    if event_name != "MODIFY" or not new or not old:
+        return []
+
+    result = []
+    timestamp = new.get("updated_at")
+    created_by = new.get("created_by")
+
+    # Cambio masivo: ActualizarEstadoIncidentes ya envió los avisos agrupados
+    batched = bool(new.get("status_batch")) and new.get("status_batch") != old.get("status_batch")
+
+    if old.get("status") != new.get("status") and not batched:
+        result.append((
+            ("rol", "Personal administrativo"),
+            messages.estado_cambiado(new, old.get("status"), new.get("status"), new.get("updated_by"), timestamp)
+        ))
+        if messages.has_reporter(new):
+            result.append((
+                ("usuario", created_by),
+                messages.actualizacion_incidente(new, new.get("status"), timestamp)
+            ))
+        return result
+
+    if old.get("report_count") != new.get("report_count"):
+        # Reporte adicional agrupado en este incidente
+        if should_notify(new.get("report_count", 1)):
+            result.append((("admins", None), messages.reportes_adicionales(new, new.get("last_reported_by_name"), timestamp)))
+        return result
+
+    updated_fields = [f for f in messages.FIELD_LABELS if old.get(f) != new.get(f)]
+    if updated_fields and messages.has_reporter(new):
+        result.append((
+            ("usuario", created_by),
+            messages.incidente_editado(new, updated_fields, timestamp)
+        ))
+    return result
+
+
+def derive_deliveries(records):
+    result = []
+    for record in records:
+        try:
+            result.extend(deliveries_for(record))
+        except Exception as e:
+            # Un registro malformado no debe bloquear el resto del lote
+            print(f"Error procesando registro {record.get('eventID')}: {str(e)}")
+    return result
+
+
+@instrumentar
+def handler(event, context):
+    """
+    Consumidor del stream de la tabla de incidentes: procesa el lote completo
+    y envía las notificaciones fuera del camino de las escrituras.
+    """
+    records = event.get("Records", [])
+    deliveries = derive_deliveries(records)
+    deliver(deliveries)
+    print(f"✓ Stream: {len(records)} registros, {len(deliveries)} notificaciones")
+    return {"records": len(records), "notifications": len(deliveries)}
+
+
+if __name__ == "__main__":
+    # Reproduce eventos grabados del stream en local:
+    #   python -m WebSocket.stream_notify WebSocket/fixtures/stream_*.json
+    parser = argparse.ArgumentParser(description="Procesa eventos grabados de DynamoDB Streams")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--send", action="store_true", help="enviar de verdad (por defecto solo imprime)")
+    args = parser.parse_args()
+
+    for path in args.files:
+        with open(path) as f:
+            event = json.load(f)
+        if args.send:
+            handler(event, None)
+            continue
+        for target, message in derive_deliveries(event.get("Records", [])):
+            json.dump({"destino": target, "mensaje": message}, sys.stdout, ensure_ascii=False, default=json_default)
+            sys.stdout.write("\n")
@@ -0,0 +1,79 @@
+import os
+import time
+import json
+from lambdas import db
+from lambdas.metrics import instrumentar
+from WebSocket.notify import probe_connections, remove_connections, extend_connections
+
+# Cada cuánto corre el barrido (debe coincidir con el schedule de serverless.yml)
+SWEEP_INTERVAL_SECONDS = int(os.environ.get("SWEEP_INTERVAL_SECONDS", "900"))
+# Conexiones por tanda de get_connection
+PROBE_BATCH = 200
+# Solo se renuevan las conexiones a las que les queda menos que esto. Un
+# cliente con heartbeat (cada 5 min, TTL de 15) siempre tiene más y no se toca.
+NEAR_EXPIRY_SECONDS = SWEEP_INTERVAL_SECONDS // 2
+# Una conexión renovada aquí dura hasta el próximo barrido más un margen que
+# cae por debajo de NEAR_EXPIRY_SECONDS: ese barrido la vuelve a renovar.
+REFRESH_SECONDS = SWEEP_INTERVAL_SECONDS + NEAR_EXPIRY_SECONDS // 2
+
+
+def _scan_connections():
+    scan_kwargs = {"ProjectionExpression": "connectionId, expires_at"}
+    while True:
+        resp = db.sockets_table().scan(**scan_kwargs)
+        yield from resp.get("Items", [])
+        if "LastEvaluatedKey" not in resp:
+            return
+        scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+def sweep():
+    """
+    Borra las conexiones vencidas y las que API Gateway ya no reconoce.
+    Las vencidas no se consultan; el resto se verifica con get_connection
+    en paralelo y las muertas se borran con BatchWriteItem.
+    """
+    now = int(time.time())
+    summary = {"checked": 0, "expired": 0, "gone": 0, "refreshed": 0, "errors": 0}
+    expired = []
+    pending = []
+
+    def flush(batch):
+        results = probe_connections([item["connectionId"] for item in batch])
+        gone = [item["connectionId"] for item, r in zip(batch, results) if r == "gone"]
+        remove_connections(gone)
+        # Sin expires_at (filas anteriores al TTL) o a punto de vencer: clientes
+        # vivos sin heartbeat, se renuevan para que sigan recibiendo avisos
+        due = [
+            item["connectionId"] for item, r in zip(batch, results)
+            if r == "ok" and int(item.get("expires_at") or 0) < now + NEAR_EXPIRY_SECONDS
+        ]
+        refreshed = extend_connections(due, now + REFRESH_SECONDS)
+        summary["checked"] += len(batch)
+        summary["gone"] += len(gone) + refreshed.count("gone")
+        summary["refreshed"] += refreshed.count("ok")
+        summary["errors"] += results.count("error") + refreshed.count("error")
+
+    for item in _scan_connections():
+        exp = item.get("expires_at")
+        if exp is not None and int(exp) < now:
+            # El TTL de DynamoDB puede tardar horas en borrarla
+            expired.append(item["connectionId"])
+            continue
+        pending.append(item)
+        if len(pending) >= PROBE_BATCH:
+            flush(pending)
+            pending = []
+    if pending:
+        flush(pending)
+
+    remove_connections(expired)
+    summary["expired"] = len(expired)
+    return summary
+
+
+@instrumentar
+def handler(event, context):
+    summary = sweep()
+    print(f"✓ Barrido de conexiones: {summary}")
+    return {"statusCode": 200, "body": json.dumps(summary)}
@@ -0,0 +1,53 @@
+"""
+Mide el costo de crear el recurso DynamoDB en cada invocación (patrón anterior)
+frente a reutilizar el de lambdas.db durante la vida del contenedor.
+
+No hace llamadas de red: solo mide la construcción de sesión/cliente/tabla.
+
+    python -m benchmarks.bench_client_reuse --iterations 200
+"""
+import os
+import time
+import argparse
+import statistics
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("INCIDENTS_TABLE", "Incidents")
+
+import boto3
+from lambdas import db
+
+
+def per_invocation():
+    # Lo que hacían los handlers dentro de lambda_handler
+    return boto3.resource("dynamodb").Table(os.environ["INCIDENTS_TABLE"])
+
+
+def reused():
+    return db.incidents_table()
+
+
+def measure(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 4),
+        "mean_ms": round(statistics.mean(samples), 4)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    # Primera llamada fuera de la medición (equivale al cold start)
+    reused()
+
+    print("por invocación:", measure(per_invocation, args.iterations))
+    print("reutilizado:   ", measure(reused, args.iterations))
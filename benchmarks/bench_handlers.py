@@ -0,0 +1,530 @@
+"""
+Benchmark offline de los handlers (Incidentes, Usuarios y WebSocket) con
+eventos sintéticos de API Gateway, sobre DynamoDB/S3 en memoria (moto) y un
+post_to_connection falso.
+
+Las tablas se crean con las definiciones de `resources` de serverless.yml y
+se llenan con --incidents incidentes y --connections conexiones. Por cada
+handler informa p50/p95/p99, llamadas AWS por invocación (por operación) y
+el pico de memoria de una invocación.
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.bench_handlers --incidents 1000 --connections 200
+    python -m benchmarks.bench_handlers --incidents 100000 --only Buscar --iterations 20
+    python -m benchmarks.bench_handlers --send-latency-ms 20 --only notify --json > fanout.json
+"""
+import os
+import io
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import importlib
+import statistics
+import tracemalloc
+import contextlib
+from collections import Counter
+from urllib.parse import unquote
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECRET = "bench-secret-bench-secret-bench-32"
+
+# Entorno de los handlers; tiene que estar antes de importarlos
+BENCH_ENV = {
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "AWS_ACCESS_KEY_ID": "bench",
+    "AWS_SECRET_ACCESS_KEY": "bench",
+    "INCIDENTS_TABLE": "Incidents",
+    "USERS_TABLE": "Users",
+    "SOCKET_TABLE": "Sockets",
+    "INCIDENTS_META_TABLE": "IncidentsMeta",
+    "INCIDENT_HISTORY_TABLE": "IncidentHistory",
+    "INCIDENT_SEARCH_TABLE": "IncidentSearch",
+    "EXPORT_BUCKET": "bench-exports",
+    "JWT_SECRET": SECRET,
+    "WEBSOCKET_ENDPOINT": "https://bench.execute-api.us-east-1.amazonaws.com/dev",
+}
+
+try:
+    from moto import mock_aws
+except ImportError:
+    mock_aws = None
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+TYPES = ["infrastructure", "electric_failure", "water_failure", "security", "cleaning", "technology", "other"]
+URGENCIES = ["low", "medium", "high", "critical"]
+STATUSES = ["pending", "in_progress", "completed", "rejected"]
+ADMIN_ROLES = ["Personal administrativo", "Autoridad"]
+FLOORS = 12
+DESCRIPTIONS = [
+    "El proyector del aula no enciende",
+    "Fuga de agua en el baño del pasillo",
+    "Se cortó la luz en el laboratorio de cómputo",
+    "La puerta de emergencia no cierra bien",
+    "Wi-Fi intermitente en la biblioteca",
+    "Papeleras llenas en la cafetería"
+]
+SEARCHES = ["proyector", "proy", "agua baño", "laboratorio", "wi-fi", "A-3", "cafeteria"]
+PASSWORD = "secreto"
+
+
+# --- Tablas -----------------------------------------------------------------
+
+class _CfnLoader(yaml.SafeLoader if yaml else object):
+    pass
+
+
+if yaml:
+    # Tags de CloudFormation (!Ref, !GetAtt...): se leen como texto
+    _CfnLoader.add_multi_constructor("!", lambda loader, suffix, node: None)
+
+
+def _substitute(value, config):
+    # Variables de serverless usadas en las condiciones: ${env:X, 'def'} y ${self:custom.x}
+    def replace(match):
+        ref, _, default = match.group(1).partition(",")
+        ref = ref.strip()
+        if ref.startswith("env:"):
+            return os.environ.get(ref[4:], default.strip().strip("'\""))
+        if ref.startswith("self:"):
+            node = config
+            for part in ref[5:].split("."):
+                node = node[part]
+            return _substitute(str(node), config)
+        return match.group(0)
+    return re.sub(r"\$\{([^{}]+)\}", replace, value) if isinstance(value, str) else value
+
+
+def _condition(node, conditions, config):
+    if "Condition" in node:
+        return _condition(conditions[node["Condition"]], conditions, config)
+    if "Fn::Equals" in node:
+        left, right = (_substitute(v, config) for v in node["Fn::Equals"])
+        return left == right
+    if "Fn::Not" in node:
+        return not _condition(node["Fn::Not"][0], conditions, config)
+    if "Fn::And" in node:
+        return all(_condition(c, conditions, config) for c in node["Fn::And"])
+    if "Fn::Or" in node:
+        return any(_condition(c, conditions, config) for c in node["Fn::Or"])
+    raise ValueError(f"Condición no soportada: {node}")
+
+
+_NO_VALUE = object()
+
+
+def _resolve(node, conditions, config):
+    """
+    Resuelve Fn::If y quita AWS::NoValue (GSIs por pasos de migración).
+    """
+    if isinstance(node, dict):
+        if node == {"Ref": "AWS::NoValue"}:
+            return _NO_VALUE
+        if "Fn::If" in node:
+            name, when_true, when_false = node["Fn::If"]
+            chosen = when_true if _condition({"Condition": name}, conditions, config) else when_false
+            return _resolve(chosen, conditions, config)
+        return {k: v for k, v in ((k, _resolve(v, conditions, config)) for k, v in node.items()) if v is not _NO_VALUE}
+    if isinstance(node, list):
+        return [v for v in (_resolve(v, conditions, config) for v in node) if v is not _NO_VALUE]
+    return node
+
+
+def table_definitions():
+    """
+    Definiciones de las tablas DynamoDB de serverless.yml, con los nombres
+    `${self:provider.environment.X}` resueltos contra el entorno.
+    """
+    if yaml is None:
+        raise SystemExit("Falta PyYAML: pip install -r benchmarks/requirements.txt")
+    with open(os.path.join(ROOT, "serverless.yml")) as f:
+        config = yaml.load(f, Loader=_CfnLoader)
+
+    definitions = []
+    conditions = config["resources"].get("Conditions", {})
+    for resource in config["resources"]["Resources"].values():
+        if resource.get("Type") != "AWS::DynamoDB::Table":
+            continue
+        props = _resolve(resource["Properties"], conditions, config)
+        match = re.search(r"environment\.(\w+)|env:(\w+)", props["TableName"])
+        props["TableName"] = os.environ[match.group(1) or match.group(2)]
+        # Propiedades solo de CloudFormation
+        for key in ("StreamSpecification", "TimeToLiveSpecification", "Tags", "PointInTimeRecoverySpecification"):
+            props.pop(key, None)
+        definitions.append(props)
+    return definitions
+
+
+# --- Contadores de llamadas y API Gateway falso -------------------------------
+
+class AwsCalls:
+    """
+    Cuenta las llamadas por operación (hook before-call de botocore) y
+    responde post_to_connection y get_connection sin red. Las conexiones en
+    `gone` devuelven GoneException, como las que ya se cerraron.
+    """
+
+    def __init__(self, send_latency_ms=0.0):
+        self.counts = Counter()
+        self.send_latency = send_latency_ms / 1000
+        self.gone = set()
+        self.sent = 0
+
+    def before_call(self, model, params, **kwargs):
+        operation = f"{model.service_model.service_name}.{model.name}"
+        self.counts[operation] += 1
+        if operation not in ("apigatewaymanagementapi.PostToConnection", "apigatewaymanagementapi.GetConnection"):
+            return None
+
+        from botocore.awsrequest import AWSResponse
+        if self.send_latency:
+            time.sleep(self.send_latency)
+        # `params` es el request ya serializado: el id va en la URL
+        connection_id = unquote(params.get("url_path", "").rsplit("/", 1)[-1])
+        if connection_id in self.gone:
+            error = {"Error": {"Code": "GoneException", "Message": "gone"},
+                     "ResponseMetadata": {"HTTPStatusCode": 410}}
+            return AWSResponse("", 410, {}, None), error
+        if operation == "apigatewaymanagementapi.GetConnection":
+            return AWSResponse("", 200, {}, None), {"ConnectionId": connection_id,
+                                                     "ResponseMetadata": {"HTTPStatusCode": 200}}
+        self.sent += 1
+        return AWSResponse("", 200, {}, None), {"ResponseMetadata": {"HTTPStatusCode": 200}}
+
+    def snapshot(self):
+        return Counter(self.counts)
+
+
+# --- Datos sintéticos --------------------------------------------------------
+
+def _token(user_id, rol):
+    import jwt
+    payload = {"user_id": user_id, "correo": f"{user_id}@utec.edu.pe", "rol": rol,
+               "exp": int(time.time()) + 24 * 3600}
+    return jwt.encode(payload, SECRET, algorithm="HS256")
+
+
+def make_incident(i, students, now):
+    from lambdas import index_keys
+    incident_id = hashlib.md5(f"bench-{i}".encode()).hexdigest()
+    created_at = (now - timedelta(minutes=i * 7 % (90 * 24 * 60))).isoformat()
+    urgency = URGENCIES[i % len(URGENCIES)]
+    floor = i % FLOORS + 1
+    status = STATUSES[i % len(STATUSES)]
+    student = students[i % len(students)]
+    return {
+        "incident_id": incident_id,
+        "type": TYPES[i % len(TYPES)],
+        "floor": floor,
+        "ambient": f"A-{floor}{i % 20:02d}",
+        "description": f"{DESCRIPTIONS[i % len(DESCRIPTIONS)]} (caso {i})",
+        "urgency": urgency,
+        "status": status,
+        "created_by": student,
+        "reported_by_name": f"Estudiante {student[-4:]}",
+        "created_at": created_at,
+        "updated_at": created_at,
+        "updated_bucket": index_keys.updated_bucket(created_at),
+        "urgency_shard": index_keys.urgency_shard(urgency, incident_id),
+        "floor_shard": index_keys.floor_shard(floor, incident_id),
+        "status_shard": index_keys.status_shard(status, incident_id)
+    }
+
+
+def seed(incidents, connections, gone_ratio, calls):
+    """
+    Crea las tablas y las llena. Devuelve el contexto que usan los eventos.
+    """
+    from lambdas import db, history, stats, search
+
+    client = db.ddb_client()
+    for definition in table_definitions():
+        client.create_table(**definition)
+    db.client("s3").create_bucket(Bucket=os.environ["EXPORT_BUCKET"])
+
+    now = datetime.now(timezone.utc)
+    students = [f"student-{n:06d}" for n in range(max(10, incidents // 20))]
+    admins = [f"admin-{n:03d}" for n in range(10)]
+    password_hash = hashlib.sha256(PASSWORD.encode()).hexdigest()
+
+    with db.users_table().batch_writer() as batch:
+        for user_id in students + admins:
+            batch.put_item(Item={
+                "user_id": user_id,
+                "correo": f"{user_id}@utec.edu.pe",
+                "password": password_hash,
+                "nombres": "Usuario",
+                "apellidos": user_id,
+                "rol": "Estudiante" if user_id.startswith("student") else ADMIN_ROLES[0]
+            })
+
+    counters = Counter()
+    incident_ids = []
+    pending_ids = []
+    with db.incidents_table().batch_writer() as batch, db.history_table().batch_writer() as hist, \
+            db.search_table().batch_writer() as postings:
+        for i in range(incidents):
+            item = make_incident(i, students, now)
+            batch.put_item(Item=item)
+            hist.put_item(Item=history.entry(item["incident_id"], "created", item["created_by"], item["created_at"]))
+            for token in search.tokens_for(item):
+                postings.put_item(Item=search.posting(token, item["incident_id"], item["created_at"]))
+            counters.update(stats.diff(None, item))
+            incident_ids.append(item["incident_id"])
+            if item["status"] == "pending":
+                pending_ids.append(item["incident_id"])
+    if counters:
+        db.meta_table().put_item(Item={**stats.STATS_KEY, **counters})
+
+    connection_ids = []
+    with db.sockets_table().batch_writer() as batch:
+        for n in range(connections):
+            # ~1 de cada 4 conexiones es de un administrador
+            if n % 4 == 0:
+                user_id, rol = admins[n % len(admins)], ADMIN_ROLES[n % 8 // 4]
+            else:
+                user_id, rol = students[n % len(students)], "Estudiante"
+            connection_id = f"conn-{n:07d}"
+            batch.put_item(Item={"connectionId": connection_id, "user_id": user_id, "rol": rol, "connected_at": 0})
+            connection_ids.append(connection_id)
+    calls.gone = set(random.Random(7).sample(connection_ids, int(len(connection_ids) * gone_ratio)))
+
+    pending_set = set(pending_ids)
+    return {
+        "now": now,
+        "students": students,
+        "admins": admins,
+        "incident_ids": incident_ids,
+        # Solo se editan incidentes pendientes: los cambios de estado no los tocan
+        "pending_ids": pending_ids,
+        "other_ids": [i for i in incident_ids if i not in pending_set] or incident_ids,
+        "connection_ids": connection_ids,
+        "admin_token": _token(admins[0], ADMIN_ROLES[0]),
+        "student_tokens": {s: _token(s, "Estudiante") for s in students[:50]},
+    }
+
+
+# --- Eventos -----------------------------------------------------------------
+
+def _http(body=None, params=None, token=None):
+    event = {"headers": {}, "queryStringParameters": params, "requestContext": {}}
+    if body is not None:
+        event["body"] = json.dumps(body)
+    if token:
+        event["headers"]["Authorization"] = f"Bearer {token}"
+    return event
+
+
+def _stream_event(ctx, rng):
+    from boto3.dynamodb.types import TypeSerializer
+    serializer = TypeSerializer()
+    students = ctx["students"]
+    old = make_incident(rng.randrange(len(ctx["incident_ids"])), students, ctx["now"])
+    new = {**old, "status": "completed", "updated_by": ctx["admins"][0], "updated_at": ctx["now"].isoformat()}
+    image = lambda item: {k: serializer.serialize(v) for k, v in item.items()}
+    return {"Records": [{
+        "eventID": "bench",
+        "eventName": "MODIFY",
+        "dynamodb": {"OldImage": image(old), "NewImage": image(new)}
+    }]}
+
+
+def scenarios(ctx, rng):
+    """
+    (nombre, módulo, función, fábrica de eventos(i), iteraciones máximas o None)
+    """
+    ids = ctx["other_ids"]
+    pick = lambda: rng.choice(ids)
+    pending = lambda: rng.choice(ctx["pending_ids"] or ctx["incident_ids"])
+    student = lambda: rng.choice(ctx["students"][:50])
+    admin = ctx["admin_token"]
+
+    def crear(i):
+        # Ambiente distinto en cada reporte: siempre crea (sin agrupar)
+        return _http({"type": rng.choice(TYPES), "floor": rng.randint(1, FLOORS), "ambient": f"A-{i}",
+                      "description": "Nuevo incidente de benchmark", "urgency": rng.choice(URGENCIES),
+                      "created_by": student()})
+
+    def crear_repetido(i):
+        # Tormenta de reportes del mismo problema: el primero crea, el resto se agrupa
+        return _http({"type": "water_failure", "floor": 1, "ambient": "Baño 1",
+                      "description": "Fuga de agua", "urgency": "high", "created_by": student()})
+
+    def crear_usuario(i):
+        return _http({"nombres": "Nuevo", "apellidos": "Usuario", "dni": f"{70000000 + i:08d}",
+                      "correo": f"nuevo-{i}-{rng.random():.6f}@utec.edu.pe", "password": PASSWORD,
+                      "rol": "Estudiante"})
+
+    def login(i):
+        user_id = student()
+        return _http({"correo": f"{user_id}@utec.edu.pe", "password": PASSWORD})
+
+    def cambios(i):
+        # Cursor de un cliente que sigue los cambios desde hace unas horas
+        from lambdas.utils import encode_cursor
+        since = ctx["now"] - timedelta(hours=rng.randint(1, 12))
+        return _http(params={"since": encode_cursor({"since": since.isoformat(), "seen": []}), "limit": "100"})
+
+    def connect(i):
+        user_id = student()
+        return {"requestContext": {"connectionId": f"bench-new-{i}", "requestTimeEpoch": 0},
+                "queryStringParameters": {"token": ctx["student_tokens"][user_id]}}
+
+    return [
+        ("CrearIncidente", "lambdas.Incidentes.CrearIncidente", "lambda_handler", crear, None),
+        ("CrearIncidenteRepetido", "lambdas.Incidentes.CrearIncidente", "lambda_handler", crear_repetido, None),
+        ("GetAllIncidents", "lambdas.Incidentes.GetAllIncidents", "lambda_handler",
+         lambda i: _http(params={"limit": "50"}), None),
+        ("BuscarIncidentesPorPiso", "lambdas.Incidentes.BuscarIncidentesPorPiso", "lambda_handler",
+         lambda i: _http(params={"floor": str(rng.randint(1, FLOORS))}), None),
+        ("BuscarIncidentesPorUrgencia", "lambdas.Incidentes.BuscarIncidentesPorUrgencia", "lambda_handler",
+         lambda i: _http(params={"urgency": rng.choice(URGENCIES)}), None),
+        ("BuscarIncidentesPorAlumno", "lambdas.Incidentes.BuscarIncidentesPorAlumno", "lambda_handler",
+         lambda i: _http(params={"student_id": student()}), None),
+        ("BuscarIncidentes", "lambdas.Incidentes.BuscarIncidentes", "lambda_handler",
+         lambda i: _http(params={"floor": str(rng.randint(1, FLOORS)), "status": rng.choice(STATUSES)}), None),
+        ("HistorialIncidente", "lambdas.Incidentes.HistorialIncidente", "lambda_handler",
+         lambda i: _http(params={"incident_id": rng.choice(ctx["incident_ids"])}), None),
+        ("BusquedaIncidentes", "lambdas.Incidentes.BusquedaIncidentes", "lambda_handler",
+         lambda i: _http(params={"q": rng.choice(SEARCHES), "status": rng.choice([None, "pending"])}), None),
+        ("EstadisticasIncidentes", "lambdas.Incidentes.EstadisticasIncidentes", "lambda_handler",
+         lambda i: _http(), None),
+        ("CambiosIncidentes", "lambdas.Incidentes.CambiosIncidentes", "lambda_handler", cambios, None),
+        ("ActualizarEstadoIncidente", "lambdas.Incidentes.ActualizarEstadoIncidente", "lambda_handler",
+         lambda i: _http({"incident_id": pick(), "new_status": STATUSES[i % len(STATUSES)]}, token=admin), None),
+        ("ActualizarEstadoIncidentes", "lambdas.Incidentes.ActualizarEstadoIncidentes", "lambda_handler",
+         lambda i: _http({"incident_ids": rng.sample(ids, min(20, len(ids))),
+                          "new_status": STATUSES[i % len(STATUSES)]}, token=admin), None),
+        ("EditarIncidente", "lambdas.Incidentes.EditarIncidente", "lambda_handler",
+         lambda i: _http({"incident_id": pending(), "description": f"Editado {i}"}, token=admin), None),
+        ("ExportarIncidentes", "lambdas.Incidentes.ExportarIncidentes", "lambda_handler",
+         lambda i: {"format": "ndjson", "key": f"exports/bench-{i}.ndjson"}, 3),
+        ("LoginUsuario", "lambdas.Usuarios.LoginUsuario", "lambda_handler", login, None),
+        ("CrearUsuario", "lambdas.Usuarios.CrearUsuario", "lambda_handler", crear_usuario, None),
+        ("connect", "WebSocket.connect", "handler", connect, None),
+        ("disconnect", "WebSocket.disconnect", "handler",
+         lambda i: {"requestContext": {"connectionId": f"bench-new-{i}"}}, None),
+        ("stream_notify", "WebSocket.stream_notify", "handler", lambda i: _stream_event(ctx, rng), None),
+        ("heartbeat", "WebSocket.heartbeat", "handler",
+         lambda i: {"requestContext": {"connectionId": rng.choice(ctx["connection_ids"])}}, None),
+        # Recorre todas las conexiones en cada invocación: pocas iteraciones
+        ("sweeper", "WebSocket.sweeper", "handler", lambda i: {}, 3),
+    ]
+
+
+# --- Medición ----------------------------------------------------------------
+
+def percentiles(samples):
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return value, value, value
+    q = statistics.quantiles(samples, n=100, method="inclusive")
+    return q[49], q[94], q[98]
+
+
+def run_scenario(name, handler, factory, iterations, calls, verbose):
+    quiet = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    samples = []
+    status_codes = Counter()
+    before = calls.snapshot()
+    with quiet:
+        for i in range(iterations):
+            event = factory(i)
+            started = time.perf_counter()
+            result = handler(event, None)
+            samples.append((time.perf_counter() - started) * 1000)
+            # Los consumidores de stream no devuelven statusCode
+            status_codes[(result or {}).get("statusCode", "ok")] += 1
+        per_call = calls.snapshot() - before
+
+        # Pico de memoria en una invocación aparte (tracemalloc distorsiona los tiempos)
+        event = factory(iterations)
+        tracemalloc.start()
+        handler(event, None)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    p50, p95, p99 = percentiles(samples)
+    return {
+        "iterations": iterations,
+        "p50_ms": round(p50, 2),
+        "p95_ms": round(p95, 2),
+        "p99_ms": round(p99, 2),
+        "mean_ms": round(statistics.fmean(samples), 2),
+        "status": {str(k): v for k, v in status_codes.items()},
+        "aws_calls_per_invocation": {op: round(n / iterations, 2) for op, n in sorted(per_call.items())},
+        "peak_memory_kib": round(peak / 1024, 1)
+    }
+
+
+def report(name, result):
+    print(f"{name:<28} p50 {result['p50_ms']:8.2f}  p95 {result['p95_ms']:8.2f}  p99 {result['p99_ms']:8.2f} ms"
+          f"  pico {result['peak_memory_kib']:9.1f} KiB  {result['status']}")
+    calls = ", ".join(f"{op.split('.', 1)[1]} {n:g}" for op, n in result["aws_calls_per_invocation"].items())
+    if calls:
+        print(f"{'':<28} llamadas/invocación: {calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--incidents", type=int, default=1000)
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--only", help="solo escenarios cuyo nombre contenga este texto")
+    parser.add_argument("--gone-ratio", type=float, default=0.05, help="fracción de conexiones cerradas")
+    parser.add_argument("--send-latency-ms", type=float, default=0.0, help="latencia simulada de post_to_connection")
+    parser.add_argument("--query-cache", choices=["none", "memory"], default="none",
+                        help="backend de lambdas.query_cache (por defecto se mide la consulta)")
+    parser.add_argument("--notify-via-stream", action="store_true", help="los handlers no notifican")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="no ocultar los print de los handlers")
+    args = parser.parse_args()
+
+    if mock_aws is None:
+        raise SystemExit("Falta moto: pip install -r benchmarks/requirements.txt")
+
+    os.environ.update(BENCH_ENV)
+    os.environ["QUERY_CACHE_BACKEND"] = args.query_cache
+    os.environ["NOTIFY_VIA_STREAM"] = "true" if args.notify_via_stream else "false"
+
+    with mock_aws():
+        import boto3
+        calls = AwsCalls(args.send_latency_ms)
+        boto3.setup_default_session()
+        boto3.DEFAULT_SESSION.events.register("before-call", calls.before_call)
+
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ctx = seed(args.incidents, args.connections, args.gone_ratio, calls)
+        if not args.json:
+            print(f"Datos: {args.incidents} incidentes, {args.connections} conexiones "
+                  f"({len(calls.gone)} cerradas), sembrado en {time.perf_counter() - started:.1f} s")
+
+        rng = random.Random(args.seed)
+        results = {}
+        for name, module_name, function_name, factory, max_iterations in scenarios(ctx, rng):
+            if args.only and args.only.lower() not in f"{name} {module_name}".lower():
+                continue
+            handler = getattr(importlib.import_module(module_name), function_name)
+            iterations = min(args.iterations, max_iterations or args.iterations)
+            results[name] = run_scenario(name, handler, factory, iterations, calls, args.verbose)
+            if not args.json:
+                report(name, results[name])
+
+    if args.json:
+        json.dump({"incidents": args.incidents, "connections": args.connections, "results": results},
+                  sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Compara la serialización anterior (clean_decimals + json.dumps) con
+lambdas.utils.dumps (un solo pase con encoder Decimal-aware, y orjson si
+está instalado) sobre incidentes sintéticos con historial largo.
+
+    python -m benchmarks.bench_serialization --items 2000 --history 30
+"""
+import json
+import time
+import argparse
+import statistics
+from decimal import Decimal
+
+from lambdas import utils
+
+
+def clean_decimals(obj):
+    # Copia de la versión que tenían los handlers antes de este cambio
+    if isinstance(obj, list):
+        return [clean_decimals(i) for i in obj]
+    if isinstance(obj, dict):
+        return {k: clean_decimals(v) for k, v in obj.items()}
+    if isinstance(obj, Decimal):
+        if obj % 1 == 0:
+            return int(obj)
+        return float(obj)
+    return obj
+
+
+def make_items(n, history_len):
+    return [{
+        "incident_id": f"{i:032x}",
+        "type": "electric_failure",
+        "floor": Decimal(i % 12 + 1),
+        "ambient": f"A-{300 + i % 50}",
+        "description": "Se apagaron las luces del aula durante la clase",
+        "urgency": "high",
+        "status": "pending",
+        "created_by": "3f1c9a2e-0000-4000-8000-000000000000",
+        "reported_by_name": "Estudiante de Prueba",
+        "created_at": "2026-10-01T12:00:00+00:00",
+        "updated_at": "2026-10-01T12:00:00+00:00",
+        "history": [{
+            "action": "status_changed_to_in_progress",
+            "by": "admin",
+            "at": "2026-10-01T12:00:00+00:00",
+            "seq": Decimal(h)
+        } for h in range(history_len)]
+    } for i in range(n)]
+
+
+def legacy(items):
+    return json.dumps(clean_decimals(items))
+
+
+def single_pass_json(items):
+    return json.dumps(items, default=utils.json_default)
+
+
+def measure(fn, items, rounds):
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn(items)
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--history", type=int, default=30)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    items = make_items(args.items, args.history)
+    assert json.loads(legacy(items)) == json.loads(utils.dumps(items))
+
+    print(f"{args.items} items, {args.history} entradas de historial (mediana en ms)")
+    print("clean_decimals + json.dumps:", measure(legacy, items, args.rounds))
+    print("json.dumps + json_default:  ", measure(single_pass_json, items, args.rounds))
+    if utils.orjson is not None:
+        print("orjson + json_default:      ", measure(utils.dumps, items, args.rounds))
+    else:
+        print("orjson no instalado")
@@ -0,0 +1,224 @@
+"""
+Mide el arranque en frío de cada handler: tiempo de import, latencia de la
+primera invocación y de la segunda (contenedor caliente), con el desglose
+de `-X importtime` de los módulos más pesados en cada fase.
+
+Cada handler se carga en un proceso nuevo. Las llamadas AWS van a un
+servidor HTTP local que responde vacío, así que no hay red y se mide solo
+el costo propio (imports, construcción de clientes, serialización).
+
+    python -m benchmarks.profile_cold_start
+    python -m benchmarks.profile_cold_start --only Login --top 8
+    python -m benchmarks.profile_cold_start --max-import-ms 150   # falla si se supera
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECRET = "profile-secret-profile-secret-32b"
+IMPORT_MARK = "@@import"
+INVOKE_MARK = "@@invoke"
+
+
+def _token(rol="Personal administrativo"):
+    import jwt
+    payload = {"user_id": "u-profile", "correo": "perfil@utec.edu.pe", "rol": rol,
+               "exp": int(time.time()) + 3600}
+    return jwt.encode(payload, SECRET, algorithm="HS256")
+
+
+def _http(body=None, params=None, auth=False):
+    event = {"headers": {}, "queryStringParameters": params}
+    if body is not None:
+        event["body"] = json.dumps(body)
+    if auth:
+        event["headers"]["Authorization"] = f"Bearer {_token()}"
+    return event
+
+
+def handler_events():
+    incident = {"type": "electric_failure", "floor": 3, "ambient": "A-301",
+                "description": "Sin luz en el aula", "urgency": "high", "created_by": "u-profile"}
+    return [
+        ("lambdas.Incidentes.CrearIncidente", "lambda_handler", _http(incident)),
+        ("lambdas.Incidentes.GetAllIncidents", "lambda_handler", _http(params={"limit": "50"})),
+        ("lambdas.Incidentes.BuscarIncidentesPorPiso", "lambda_handler", _http(params={"floor": "3"})),
+        ("lambdas.Incidentes.BuscarIncidentesPorUrgencia", "lambda_handler", _http(params={"urgency": "high"})),
+        ("lambdas.Incidentes.BuscarIncidentesPorAlumno", "lambda_handler", _http(params={"student_id": "u-profile"})),
+        ("lambdas.Incidentes.BuscarIncidentes", "lambda_handler", _http(params={"status": "pending"})),
+        ("lambdas.Incidentes.HistorialIncidente", "lambda_handler", _http(params={"incident_id": "x"})),
+        ("lambdas.Incidentes.EstadisticasIncidentes", "lambda_handler", _http()),
+        ("lambdas.Incidentes.ActualizarEstadoIncidente", "lambda_handler",
+         _http({"incident_id": "x", "new_status": "completed"}, auth=True)),
+        ("lambdas.Incidentes.ActualizarEstadoIncidentes", "lambda_handler",
+         _http({"incident_ids": ["x", "y"], "new_status": "completed"}, auth=True)),
+        ("lambdas.Incidentes.EditarIncidente", "lambda_handler",
+         _http({"incident_id": "x", "description": "editado"}, auth=True)),
+        ("lambdas.Usuarios.LoginUsuario", "lambda_handler",
+         _http({"correo": "perfil@utec.edu.pe", "password": "secreto"})),
+        ("lambdas.Usuarios.CrearUsuario", "lambda_handler",
+         _http({"correo": "perfil@utec.edu.pe", "password": "secreto", "nombres": "Perfil",
+                "apellidos": "Prueba", "dni": "12345678", "rol": "Estudiante"})),
+        ("WebSocket.connect", "handler",
+         {"requestContext": {"connectionId": "c-1", "requestTimeEpoch": 0},
+          "queryStringParameters": {"token": _token()}}),
+        ("WebSocket.disconnect", "handler", {"requestContext": {"connectionId": "c-1"}}),
+    ]
+
+
+# Código del proceso hijo: levanta el stub HTTP, marca las fases en stderr
+# (donde escribe -X importtime) e invoca el handler dos veces.
+CHILD = r"""
+import sys, json, time, threading, importlib
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+class Stub(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        body = b'{"Count": 0, "ScannedCount": 0, "Items": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-amz-json-1.0")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    def log_message(self, *args):
+        pass
+
+server = HTTPServer(("127.0.0.1", 0), Stub)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+endpoint = "http://127.0.0.1:%d" % server.server_port
+import os
+os.environ["AWS_ENDPOINT_URL"] = endpoint
+os.environ["WEBSOCKET_ENDPOINT"] = endpoint
+
+module_name, function_name, event = sys.argv[1], sys.argv[2], json.loads(sys.argv[3])
+
+sys.stderr.write("@@import\n"); sys.stderr.flush()
+started = time.perf_counter()
+module = importlib.import_module(module_name)
+import_ms = (time.perf_counter() - started) * 1000
+
+handler = getattr(module, function_name)
+sys.stderr.write("@@invoke\n"); sys.stderr.flush()
+started = time.perf_counter()
+first = handler(json.loads(json.dumps(event)), None)
+first_ms = (time.perf_counter() - started) * 1000
+
+started = time.perf_counter()
+handler(json.loads(json.dumps(event)), None)
+warm_ms = (time.perf_counter() - started) * 1000
+
+print(json.dumps({"import_ms": import_ms, "first_ms": first_ms, "warm_ms": warm_ms,
+                  "status": (first or {}).get("statusCode")}))
+"""
+
+
+def child_env():
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": ROOT,
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "AWS_ACCESS_KEY_ID": "profile",
+        "AWS_SECRET_ACCESS_KEY": "profile",
+        "INCIDENTS_TABLE": "Incidents",
+        "USERS_TABLE": "Users",
+        "SOCKET_TABLE": "Sockets",
+        "INCIDENTS_META_TABLE": "IncidentsMeta",
+        "INCIDENT_HISTORY_TABLE": "IncidentHistory",
+        "JWT_SECRET": SECRET,
+        "QUERY_CACHE_BACKEND": "memory",
+    })
+    return env
+
+
+def parse_importtime(stderr):
+    """
+    Separa la salida de -X importtime por fase y devuelve, por fase,
+    los imports de nivel superior como (módulo, acumulado en ms).
+    """
+    phases = {"import": [], "invoke": []}
+    current = None
+    for line in stderr.splitlines():
+        if line == IMPORT_MARK:
+            current = "import"
+            continue
+        if line == INVOKE_MARK:
+            current = "invoke"
+            continue
+        if current is None or not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2]
+        depth = len(name) - len(name.lstrip())
+        phases[current].append((depth, name.strip(), int(parts[1]) / 1000))
+
+    result = {}
+    for phase, entries in phases.items():
+        if not entries:
+            result[phase] = []
+            continue
+        top_depth = min(depth for depth, _, _ in entries)
+        result[phase] = [(name, ms) for depth, name, ms in entries if depth == top_depth]
+    return result
+
+
+def profile(module_name, function_name, event):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, module_name, function_name, json.dumps(event)],
+        capture_output=True, text=True, env=child_env(), cwd=ROOT, timeout=120
+    )
+    if proc.returncode != 0 or not proc.stdout.strip():
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "sin salida")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def report(module_name, result, top):
+    print(f"{module_name}  [HTTP {result['status']}]")
+    print(f"  import {result['import_ms']:8.1f} ms | 1ª invocación {result['first_ms']:8.1f} ms"
+          f" | caliente {result['warm_ms']:6.1f} ms")
+    for phase, label in (("import", "import"), ("invoke", "1ª invocación")):
+        heaviest = sorted(result["imports"][phase], key=lambda e: -e[1])[:top]
+        if heaviest:
+            print(f"    imports en {label}: " + ", ".join(f"{name} {ms:.1f}" for name, ms in heaviest))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", help="solo handlers cuyo módulo contenga este texto")
+    parser.add_argument("--top", type=int, default=5, help="módulos más pesados por fase")
+    parser.add_argument("--json", action="store_true", help="salida JSON (para comparar entre commits)")
+    parser.add_argument("--max-import-ms", type=float, help="falla si algún import supera este valor")
+    args = parser.parse_args()
+
+    results = {}
+    failures = []
+    for module_name, function_name, event in handler_events():
+        if args.only and args.only not in module_name:
+            continue
+        try:
+            results[module_name] = profile(module_name, function_name, event)
+        except Exception as e:
+            failures.append(module_name)
+            print(f"{module_name}: error ({str(e)})", file=sys.stderr)
+            continue
+        if not args.json:
+            report(module_name, results[module_name], args.top)
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    over = [m for m, r in results.items()
+            if args.max_import_ms is not None and r["import_ms"] > args.max_import_ms]
+    for module_name in over:
+        print(f"✗ {module_name}: import {results[module_name]['import_ms']:.1f} ms > {args.max_import_ms} ms",
+              file=sys.stderr)
+    sys.exit(1 if over or failures else 0)
@@ -68,6 +68,7 @@ export interface ApiResponse<T> {
   data?: T;
   message?: string;
   error?: string;
+  status?: number;  // Código HTTP cuando la solicitud falla
 }
 
 export interface LoginResponse {
@@ -114,6 +115,7 @@ export interface IncidentResponse {
   status: string;         // "pending", "in_progress", "completed", "rejected"
   created_by: string;     // user_id del creador
   reported_by_name?: string; // ✅ NUEVO: Nombre del que reportó
+  report_count?: number;  // Reportes del mismo problema sumados a este incidente
   created_at: string;     // ISO timestamp
   updated_at: string;     // ISO timestamp
   history?: Array<{
@@ -252,8 +254,13 @@ const handleResponse = async <T,>(response: Response): Promise<ApiResponse<T>> =
 const getAuthHeaders = (token?: string): HeadersInit => {
   const headers: HeadersInit = {
     'Content-Type': 'application/json',
+    // API Gateway solo decodifica las respuestas comprimidas si Accept es un binaryMediaType
+    'Accept': 'application/json',
   };
 
+  // Por defecto se usa el token de la sesión guardado por useAuth
+  token = token ?? localStorage.getItem('access_token') ?? undefined;
+
   if (token) {
     headers['Authorization'] = `Bearer ${token}`;
   }
@@ -319,12 +326,77 @@ export const incidentsApi = {
   // Obtener todos los incidentes
   getAll: async (): Promise<ApiResponse<IncidentResponse[]>> => {
     try {
-      const response = await fetch(`${API_BASE_URL}/incidents/all`, {
-        method: 'GET',
-        headers: getAuthHeaders()
-      });
-      
-      return await handleResponse<IncidentResponse[]>(response);
+      // El backend pagina con next_token: se recorren todas las páginas
+      const incidents: IncidentResponse[] = [];
+      let nextToken: string | null = null;
+
+      do {
+        const params = new URLSearchParams({ limit: '200' });
+        if (nextToken) {
+          params.set('next_token', nextToken);
+        }
+
+        const response = await fetch(`${API_BASE_URL}/incidents/all?${params.toString()}`, {
+          method: 'GET',
+          headers: getAuthHeaders()
+        });
+
+        if (!response.ok) {
+          return await handleResponse<IncidentResponse[]>(response);
+        }
+
+        const page = await response.json();
+        incidents.push(...(page.data || []));
+        nextToken = page.next_token || null;
+      } while (nextToken);
+
+      return {
+        success: true,
+        data: incidents
+      };
+    } catch (error) {
+      return {
+        success: false,
+        error: 'Error de conexión con el servidor'
+      };
+    }
+  },
+
+  // Cambios desde un cursor de /incidents/changes (sin cursor: empieza desde ahora).
+  // Permite resincronizar tras una notificación o reconexión sin recargar todo.
+  getChanges: async (since?: string): Promise<ApiResponse<{ incidents: IncidentResponse[]; cursor: string }>> => {
+    try {
+      const incidents: IncidentResponse[] = [];
+      let cursor = since || '';
+      let hasMore = false;
+
+      do {
+        const params = new URLSearchParams({ limit: '500' });
+        if (cursor) {
+          params.set('since', cursor);
+        }
+
+        const response = await fetch(`${API_BASE_URL}/incidents/changes?${params.toString()}`, {
+          method: 'GET',
+          headers: getAuthHeaders()
+        });
+
+        if (!response.ok) {
+          // 410: cursor demasiado antiguo, el llamador debe usar getAll()
+          const failed = await handleResponse<{ incidents: IncidentResponse[]; cursor: string }>(response);
+          return { ...failed, status: response.status };
+        }
+
+        const page = await response.json();
+        incidents.push(...(page.data || []));
+        cursor = page.next_cursor;
+        hasMore = page.has_more;
+      } while (hasMore);
+
+      return {
+        success: true,
+        data: { incidents, cursor }
+      };
     } catch (error) {
       return {
         success: false,
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, type ChangeEvent } from 'react';
+import React, { useState, useEffect, useMemo, useRef, type ChangeEvent } from 'react';
 import { LogOut, X, MapPin, Clock, Filter, Loader2, RefreshCw, Search } from 'lucide-react';
 import type { DashboardProps, Incident } from '../types';
 import { incidentsApi, INCIDENT_STATUS, URGENCY_LEVELS, STATUS_LABELS, URGENCY_LABELS, INCIDENT_TYPE_LABELS } from '../api';
@@ -7,7 +7,6 @@ import NotificationsPanel from './NotificationsPanel';
 import ToastContainer from './ToastContainer';
 
 const AuthorityDashboard: React.FC<DashboardProps> = ({ user, onLogout }) => {
-  const [incidents, setIncidents] = useState<Incident[]>([]);
   const [selectedIncident, setSelectedIncident] = useState<Incident | null>(null);
   const [showFilters, setShowFilters] = useState<boolean>(false);
   const [loading, setLoading] = useState<boolean>(true);
@@ -47,9 +46,8 @@ const AuthorityDashboard: React.FC<DashboardProps> = ({ user, onLogout }) => {
     token: localStorage.getItem('access_token'),
     onNotification: (notification) => {
       setToasts(prev => [...prev, notification]);
-      if (notification.type === 'nuevo_incidente' || notification.type === 'cambio_estado') {
-        loadIncidents();
-      }
+      // Cualquier aviso puede traer cambios en la lista: se piden solo esos
+      syncChanges();
     }
   });
 
@@ -117,56 +115,32 @@ const AuthorityDashboard: React.FC<DashboardProps> = ({ user, onLogout }) => {
     };
   };
 
+  // Lista completa sin filtrar; lo que se muestra se deriva con los filtros
+  const [allIncidents, setAllIncidents] = useState<Incident[]>([]);
+  // Cursor de /incidents/changes. En ref: el callback de notificaciones del
+  // WebSocket se registra una vez y debe ver siempre el último cursor.
+  const changesCursorRef = useRef<string | null>(null);
+  const syncingRef = useRef<boolean>(false);
+  const syncPendingRef = useRef<boolean>(false);
+
   useEffect(() => {
     loadIncidents();
   }, []);
 
+  // Carga completa: al entrar, con el botón de recargar o si el cursor venció
   const loadIncidents = async () => {
     setLoading(true);
     setError('');
     
     try {
+      // El cursor se pide antes de la carga: lo que cambie mientras tanto
+      // vuelve a llegar por /incidents/changes y se fusiona sin duplicar
+      const changes = await incidentsApi.getChanges();
       const response = await incidentsApi.getAll();
       
       if (response.success && response.data) {
-        const allIncidents = response.data.map(mapIncidentFromAPI);
-        
-        const filteredIncidents = allIncidents.filter(incident => {
-          if (filters.floor && incident._raw?.floor !== parseInt(filters.floor)) {
-            return false;
-          }
-          
-          if (filters.urgency && incident._raw?.urgency !== filters.urgency) {
-            return false;
-          }
-          
-          if (filters.status && incident._raw?.status !== filters.status) {
-            return false;
-          }
-          
-          if (filters.searchName) {
-            const searchTerm = filters.searchName.toLowerCase().trim();
-            const reportedBy = (incident.reportadoPor || '').toLowerCase();
-            
-            if (!reportedBy.includes(searchTerm)) {
-              return false;
-            }
-          }
-          
-          return true;
-        });
-        
-        const sortedIncidents = filteredIncidents.sort((a, b) => {
-          const urgencyA = getUrgencyWeight(a._raw?.urgency || 'low');
-          const urgencyB = getUrgencyWeight(b._raw?.urgency || 'low');
-          
-          if (urgencyA !== urgencyB) {
-            return urgencyB - urgencyA;
-          }
-          return b.createdAt! - a.createdAt!;
-        });
-        
-        setIncidents(sortedIncidents);
+        setAllIncidents(response.data.map(mapIncidentFromAPI));
+        changesCursorRef.current = changes.success && changes.data ? changes.data.cursor : null;
       } else {
         setError(response.error || 'Error al cargar incidentes');
       }
@@ -178,6 +152,99 @@ const AuthorityDashboard: React.FC<DashboardProps> = ({ user, onLogout }) => {
     }
   };
 
+  // Tras una notificación o reconexión: solo lo que cambió desde el cursor
+  const syncChanges = async () => {
+    let cursor = changesCursorRef.current;
+    if (!cursor) {
+      return loadIncidents();
+    }
+    if (syncingRef.current) {
+      syncPendingRef.current = true;
+      return;
+    }
+    syncingRef.current = true;
+    
+    try {
+      do {
+        syncPendingRef.current = false;
+        const response = await incidentsApi.getChanges(cursor);
+        
+        if (!response.success || !response.data) {
+          if (response.status === 410) {
+            // Cursor demasiado antiguo: única situación que obliga a recargar todo
+            changesCursorRef.current = null;
+            await loadIncidents();
+          } else {
+            // Se conserva el cursor: la próxima sincronización lo reintenta
+            console.error('Error sincronizando cambios:', response.error);
+          }
+          return;
+        }
+        
+        const changed = response.data.incidents.map(mapIncidentFromAPI);
+        cursor = response.data.cursor;
+        changesCursorRef.current = cursor;
+        if (changed.length > 0) {
+          setAllIncidents(prev => {
+            const byId = new Map(prev.map(incident => [incident.id, incident]));
+            changed.forEach(incident => byId.set(incident.id, incident));
+            return Array.from(byId.values());
+          });
+        }
+      } while (syncPendingRef.current);
+    } catch (err) {
+      console.error('Error sincronizando cambios:', err);
+    } finally {
+      syncingRef.current = false;
+    }
+  };
+
+  // Al reconectar el WebSocket se recuperan los avisos perdidos mientras tanto
+  const wasConnectedRef = useRef<boolean>(false);
+  useEffect(() => {
+    if (isConnected && wasConnectedRef.current === false && !loading) {
+      syncChanges();
+    }
+    wasConnectedRef.current = isConnected;
+  }, [isConnected]);
+
+  const incidents = useMemo(() => {
+    const filteredIncidents = allIncidents.filter(incident => {
+      if (filters.floor && incident._raw?.floor !== parseInt(filters.floor)) {
+        return false;
+      }
+      
+      if (filters.urgency && incident._raw?.urgency !== filters.urgency) {
+        return false;
+      }
+      
+      if (filters.status && incident._raw?.status !== filters.status) {
+        return false;
+      }
+      
+      if (filters.searchName) {
+        const searchTerm = filters.searchName.toLowerCase().trim();
+        const reportedBy = (incident.reportadoPor || '').toLowerCase();
+        
+        if (!reportedBy.includes(searchTerm)) {
+          return false;
+        }
+      }
+      
+      return true;
+    });
+    
+    return filteredIncidents.sort((a, b) => {
+      const urgencyA = getUrgencyWeight(a._raw?.urgency || 'low');
+      const urgencyB = getUrgencyWeight(b._raw?.urgency || 'low');
+      
+      if (urgencyA !== urgencyB) {
+        return urgencyB - urgencyA;
+      }
+      return b.createdAt! - a.createdAt!;
+    });
+  }, [allIncidents, filters.floor, filters.urgency, filters.status, filters.searchName]);
+
   const handleFilterChange = (e: ChangeEvent<HTMLSelectElement | HTMLInputElement>) => {
     const { name, value } = e.target;
     setFilters(prev => ({ ...prev, [name]: value }));
@@ -205,12 +272,6 @@ const AuthorityDashboard: React.FC<DashboardProps> = ({ user, onLogout }) => {
     return () => clearTimeout(debounceTimer);
   }, [searchInput]);
 
-  useEffect(() => {
-    if (!loading) {
-      loadIncidents();
-    }
-  }, [filters.floor, filters.urgency, filters.status, filters.searchName]);
-
   const updateIncidentStatus = async (id: string, newStatus: string) => {
     setUpdating(true);
     setError('');
@@ -225,7 +286,7 @@ const AuthorityDashboard: React.FC<DashboardProps> = ({ user, onLogout }) => {
       });
       
       if (response.success) {
-        await loadIncidents();
+        await syncChanges();
         setSelectedIncident(null);
       } else {
         setError(response.error || 'Error al actualizar el estado');
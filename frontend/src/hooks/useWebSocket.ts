@@ -3,7 +3,7 @@ import { websocketApi } from '../api';
 
 export interface Notification {
   id: string;
-  type: 'nuevo_incidente' | 'cambio_estado' | 'incidente_editado' | 'actualizacion_incidente' | 'estado_cambiado';
+  type: 'nuevo_incidente' | 'cambio_estado' | 'incidente_editado' | 'actualizacion_incidente' | 'estado_cambiado' | 'reportes_adicionales';
   title: string;
   message: string;
   timestamp: Date;
@@ -11,6 +11,9 @@ export interface Notification {
   data?: any;
 }
 
+// Renueva el TTL de la conexión en el backend (CONNECTION_TTL_SECONDS = 15 min)
+const HEARTBEAT_INTERVAL_MS = 5 * 60 * 1000;
+
 interface UseWebSocketProps {
   userId: string | null;
   rol: string;
@@ -68,6 +71,19 @@ const formatNotification = (data: any, userRole: string): { title: string; messa
       };
     }
     
+    // ========== REPORTES REPETIDOS AGRUPADOS (a admins) ==========
+    case 'reportes_adicionales': {
+      const incidentType = data.tipo_incidente || 'Incidente';
+      const location = data.piso && data.ambiente
+        ? `Piso ${data.piso} - ${data.ambiente}`
+        : 'ubicación no especificada';
+
+      return {
+        title: 'Reportes repetidos',
+        message: `${incidentType} en ${location}: ${data.total_reportes} reportes`
+      };
+    }
+
     // ========== ACTUALIZACIÓN DE INCIDENTE (a estudiante) ==========
     case 'actualizacion_incidente': {
       // El backend ya envía el mensaje formateado
@@ -144,6 +160,14 @@ export const useWebSocket = ({ userId, rol, token, onNotification }: UseWebSocke
   const manuallyClosedRef = useRef(false);
   const isConnectingRef = useRef(false);
   const connectionIdRef = useRef<string | null>(null);
+  const heartbeatIntervalRef = useRef<any>(null);
+
+  const stopHeartbeat = () => {
+    if (heartbeatIntervalRef.current) {
+      clearInterval(heartbeatIntervalRef.current);
+      heartbeatIntervalRef.current = null;
+    }
+  };
 
   const connect = () => {
     if (!userId || !token) {
@@ -188,6 +212,13 @@ export const useWebSocket = ({ userId, rol, token, onNotification }: UseWebSocke
           clearTimeout(reconnectTimeoutRef.current);
           reconnectTimeoutRef.current = null;
         }
+
+        stopHeartbeat();
+        heartbeatIntervalRef.current = setInterval(() => {
+          if (ws.readyState === WebSocket.OPEN) {
+            ws.send(JSON.stringify({ action: 'heartbeat' }));
+          }
+        }, HEARTBEAT_INTERVAL_MS);
       };
 
       ws.onmessage = (event) => {
@@ -238,6 +269,7 @@ export const useWebSocket = ({ userId, rol, token, onNotification }: UseWebSocke
         
         if (wsRef.current === ws) {
           wsRef.current = null;
+          stopHeartbeat();
         }
 
         if (manuallyClosedRef.current) {
@@ -282,6 +314,7 @@ export const useWebSocket = ({ userId, rol, token, onNotification }: UseWebSocke
       reconnectTimeoutRef.current = null;
     }
 
+    stopHeartbeat();
     setIsConnected(false);
   };
 
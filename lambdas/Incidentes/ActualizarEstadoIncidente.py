@@ -1,61 +1,36 @@
-import boto3
-import os
-import json
 from datetime import datetime, timezone
-from WebSocket.notify import notify_role, notify_user
-from lambdas.utils import response
+from WebSocket import messages
+from WebSocket.notify import notify_role, notify_user, NOTIFY_VIA_STREAM
+from lambdas import db, versions, history, index_keys, stats
+from lambdas.utils import response, parse_body
+from lambdas.auth import requiere_auth
+from lambdas.metrics import instrumentar
 
 ROLES_AUTORIZADOS = ["Personal administrativo", "Autoridad"]
 
-ddb = boto3.resource("dynamodb")
-table = ddb.Table(os.environ["INCIDENTS_TABLE"])
-users_table = ddb.Table(os.environ["USERS_TABLE"])
-INCIDENT_TYPE_LABELS = {
-    'infrastructure': 'Infraestructura',
-    'electric_failure': 'Falla Eléctrica',
-    'water_failure': 'Falla de Agua',
-    'security': 'Seguridad',
-    'cleaning': 'Limpieza',
-    'technology': 'Tecnología',
-    'other': 'Otro'
-}
-
-STATUS_LABELS = {
-    'pending': 'Pendiente',
-    'in_progress': 'En Atención',
-    'completed': 'Resuelto',
-    'rejected': 'Rechazado'
-}
 
+@instrumentar
+@requiere_auth(roles=ROLES_AUTORIZADOS)
 def lambda_handler(event, context):
     try:
+        table = db.incidents_table()
+
         # Parseo del body
-        body = event.get("body")
-        if isinstance(body, str):
-            body = json.loads(body)
+        body = parse_body(event)
 
         incident_id = body.get("incident_id")
         new_status = body.get("new_status")
-        user_id = body.get("user_id")   # usuario que intenta modificar
+        # Usuario y rol vienen del JWT ya verificado (sin leer la tabla de usuarios)
+        user_id = event["claims"]["user_id"]
 
         # Validar campos
-        if not incident_id or not new_status or not user_id:
-            return response(400, {"message": "Campos requeridos: incident_id, new_status, user_id"})
+        if not incident_id or not new_status:
+            return response(400, {"message": "Campos requeridos: incident_id, new_status"})
 
         # Validar status permitido
         if new_status not in ["pending", "in_progress", "completed", "rejected"]:
             return response(400, {"message": "Estado inválido"})
 
-        # Obtener rol del usuario
-        user_resp = users_table.get_item(Key={"user_id": user_id})
-        if "Item" not in user_resp:
-            return response(404, {"message": "Usuario no encontrado"})
-
-        rol = user_resp["Item"].get("rol")
-
-        if rol not in ROLES_AUTORIZADOS:
-            return response(403, {"message": "No tiene permisos para actualizar incidentes"})
-
         # Obtener incidente
         incident_resp = table.get_item(Key={"incident_id": incident_id})
         if "Item" not in incident_resp:
@@ -66,54 +41,46 @@ def lambda_handler(event, context):
         created_by = incident.get("created_by")  # estudiante que reportó
         now = datetime.now(timezone.utc).isoformat()
 
-        # Actualizar incidente
-        table.update_item(
-            Key={"incident_id": incident_id},
-            UpdateExpression="SET #s = :new_status, updated_at = :now, history = list_append(history, :entry)",
-            ExpressionAttributeNames={
-                "#s": "status"
-            },
-            ExpressionAttributeValues={
-                ":new_status": new_status,
-                ":now": now,
-                ":entry": [{
-                    "action": f"status_changed_to_{new_status}",
-                    "by": user_id,
-                    "at": now
-                }]
-            }
-        )
+        # Actualizar incidente + historial en una sola transacción
+        transact_items = [
+            {"Update": {
+                "TableName": table.name,
+                "Key": {"incident_id": incident_id},
+                "UpdateExpression": "SET #s = :new_status, status_shard = :ss, updated_at = :now, updated_bucket = :ub, updated_by = :by REMOVE status_batch",
+                "ConditionExpression": "#s = :old_status",
+                "ExpressionAttributeNames": {
+                    "#s": "status"
+                },
+                "ExpressionAttributeValues": {
+                    ":new_status": new_status,
+                    ":ss": index_keys.status_shard(new_status, incident_id),
+                    ":old_status": old_status,
+                    ":now": now,
+                    ":ub": index_keys.updated_bucket(now),
+                    ":by": user_id
+                }
+            }},
+            history.put_op(history.entry(incident_id, f"status_changed_to_{new_status}", user_id, now))
+        ]
+        try:
+            db.transact_write(transact_items)
+        except db.ddb_client().exceptions.TransactionCanceledException:
+            return response(409, {"message": "El incidente fue modificado por otro usuario, intente nuevamente"})
+        # La condición sobre el estado anterior garantiza que el delta se aplica una sola vez
+        stats.apply(stats.diff(incident, {**incident, "status": new_status}))
+        versions.bump(versions.scopes_for(incident))
         
 
-        # Notificación 1: Cambio de estado → Personal administrativo
-        incident_type_label = INCIDENT_TYPE_LABELS.get(incident.get("type"), "Incidente")
-        
-        message_admins = {
-            "tipo": "estado_cambiado",
-            "incident_id": incident_id,
-            "tipo_incidente": incident_type_label,  
-            "piso": incident.get("floor"),          
-            "ambiente": incident.get("ambient"),    
-            "estado_anterior": old_status,
-            "nuevo_estado": new_status,
-            "actualizado_por": user_id,
-            "timestamp": now
-        }
-        notify_role(message_admins, "Personal administrativo")
-        # Notificación 2: Notificar al estudiante que reportó el incidente
-        if created_by and created_by != "unknown":
-            new_status_label = STATUS_LABELS.get(new_status, new_status)
-            
-            message_student = {
-                "tipo": "actualizacion_incidente",
-                "incident_id": incident_id,
-                "tipo_incidente": incident_type_label,  
-                "mensaje": f"Tu incidente ha cambiado de estado",
-                "nuevo_estado": new_status,
-                "nuevo_estado_label": new_status_label,
-                "timestamp": now
-            }
-            notify_user(message_student, created_by)
+        # Con NOTIFY_VIA_STREAM los avisos los envía el consumidor del stream
+        if not NOTIFY_VIA_STREAM:
+            # Notificación 1: Cambio de estado → Personal administrativo
+            notify_role(
+                messages.estado_cambiado(incident, old_status, new_status, user_id, now),
+                "Personal administrativo"
+            )
+            # Notificación 2: Notificar al estudiante que reportó el incidente
+            if messages.has_reporter(incident):
+                notify_user(messages.actualizacion_incidente(incident, new_status, now), created_by)
 
         return response(200, {
             "message": "Estado actualizado correctamente",
@@ -0,0 +1,173 @@
+import os
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from WebSocket import messages
+from WebSocket.notify import deliver
+from lambdas import db, versions, history, index_keys, stats
+from lambdas.utils import response, parse_body
+from lambdas.auth import requiere_auth
+from lambdas.metrics import instrumentar
+
+ROLES_AUTORIZADOS = ["Personal administrativo", "Autoridad"]
+VALID_STATUSES = ["pending", "in_progress", "completed", "rejected"]
+
+MAX_BATCH = 100
+# Cada incidente usa 2 operaciones (update + historial); TransactWriteItems
+# admite hasta 100, así que el tope es 50 aunque la variable diga más.
+# Los contadores se suman aparte, al final del lote
+TRANSACT_CHUNK = max(1, min(int(os.environ.get("BATCH_TRANSACT_CHUNK", "40")), 50))
+MAX_ATTEMPTS = 3
+
+
+def _transact_items(incidents, new_status, user_id, now, batch_id):
+    items = []
+    for incident in incidents:
+        incident_id = incident["incident_id"]
+        items.append({"Update": {
+            "TableName": db.incidents_table().name,
+            "Key": {"incident_id": incident_id},
+            # status_batch: el consumidor del stream no avisa por incidente (ver stream_notify)
+            "UpdateExpression": "SET #s = :new_status, status_shard = :ss, updated_at = :now, updated_bucket = :ub, updated_by = :by, status_batch = :batch",
+            "ConditionExpression": "#s = :old_status",
+            "ExpressionAttributeNames": {"#s": "status"},
+            "ExpressionAttributeValues": {
+                ":new_status": new_status,
+                ":ss": index_keys.status_shard(new_status, incident_id),
+                ":old_status": incident.get("status"),
+                ":now": now,
+                ":ub": index_keys.updated_bucket(now),
+                ":by": user_id,
+                ":batch": batch_id
+            }
+        }})
+        items.append(history.put_op(history.entry(incident_id, f"status_changed_to_{new_status}", user_id, now)))
+    return items
+
+
+def batch_deltas(incidents, new_status):
+    # Deltas de contadores agregados de todo el lote: un solo ADD al final
+    deltas = defaultdict(int)
+    for incident in incidents:
+        for counter, delta in stats.diff(incident, {**incident, "status": new_status}).items():
+            deltas[counter] += delta
+    return dict(deltas)
+
+
+def apply_chunk(incidents, new_status, user_id, now, batch_id, results):
+    """
+    Aplica un lote en una transacción. Si se cancela, los incidentes cuya
+    condición falló se marcan como "conflict" y el resto se reintenta.
+    Devuelve los incidentes actualizados.
+    """
+    client = db.ddb_client()
+    pending = list(incidents)
+    for attempt in range(MAX_ATTEMPTS):
+        if not pending:
+            return []
+        try:
+            db.transact_write(_transact_items(pending, new_status, user_id, now, batch_id))
+            for incident in pending:
+                results[incident["incident_id"]] = "updated"
+            return pending
+        except client.exceptions.TransactionCanceledException as e:
+            reasons = e.response.get("CancellationReasons") or []
+            # Las operaciones de update están en las posiciones pares
+            failed = {
+                pending[i // 2]["incident_id"]
+                for i, reason in enumerate(reasons[:2 * len(pending)])
+                if i % 2 == 0 and reason.get("Code") == "ConditionalCheckFailed"
+            }
+            for incident_id in failed:
+                results[incident_id] = "conflict"
+            pending = [i for i in pending if i["incident_id"] not in failed]
+            if not failed:
+                print(f"Transacción cancelada (intento {attempt + 1}): {reasons}")
+    for incident in pending:
+        results[incident["incident_id"]] = "error"
+    return []
+
+
+def grouped_deliveries(changes, new_status, user_id, now):
+    """
+    Un mensaje para Personal administrativo y uno por estudiante,
+    en lugar de dos avisos por incidente.
+    """
+    deliveries = [(("rol", "Personal administrativo"), messages.estados_cambiados(changes, new_status, user_id, now))]
+    by_student = defaultdict(list)
+    for incident, _ in changes:
+        if messages.has_reporter(incident):
+            by_student[incident["created_by"]].append(incident)
+    for student_id, incidents in by_student.items():
+        if len(incidents) == 1:
+            message = messages.actualizacion_incidente(incidents[0], new_status, now)
+        else:
+            message = messages.actualizacion_incidentes(incidents, new_status, now)
+        deliveries.append((("usuario", student_id), message))
+    return deliveries
+
+
+@instrumentar
+@requiere_auth(roles=ROLES_AUTORIZADOS)
+def lambda_handler(event, context):
+    try:
+        body = parse_body(event)
+
+        incident_ids = body.get("incident_ids")
+        new_status = body.get("new_status")
+        user_id = event["claims"]["user_id"]
+
+        if not isinstance(incident_ids, list) or not incident_ids or not new_status:
+            return response(400, {"message": "Campos requeridos: incident_ids (lista), new_status"})
+
+        if new_status not in VALID_STATUSES:
+            return response(400, {"message": "Estado inválido"})
+
+        # Sin duplicados, conservando el orden
+        incident_ids = list(dict.fromkeys(str(i) for i in incident_ids))
+        if len(incident_ids) > MAX_BATCH:
+            return response(400, {"message": f"Máximo {MAX_BATCH} incidentes por solicitud"})
+
+        found = db.batch_get_incidents(incident_ids)
+        now = datetime.now(timezone.utc).isoformat()
+
+        results = {}
+        to_update = []
+        for incident_id in incident_ids:
+            incident = found.get(incident_id)
+            if incident is None:
+                results[incident_id] = "not_found"
+            elif incident.get("status") == new_status:
+                results[incident_id] = "unchanged"
+            else:
+                to_update.append(incident)
+
+        updated = []
+        batch_id = uuid.uuid4().hex
+        for start in range(0, len(to_update), TRANSACT_CHUNK):
+            try:
+                updated.extend(apply_chunk(to_update[start:start + TRANSACT_CHUNK], new_status, user_id, now, batch_id, results))
+            except Exception as e:
+                print(f"Error aplicando lote: {str(e)}")
+                for incident in to_update[start:start + TRANSACT_CHUNK]:
+                    results.setdefault(incident["incident_id"], "error")
+
+        if updated:
+            stats.apply(batch_deltas(updated, new_status))
+            versions.bump([scope for incident in updated for scope in versions.scopes_for(incident)])
+
+            # Los avisos agrupados salen siempre de aquí: el stream reparte los
+            # registros del lote entre shards e invocaciones y no podría
+            # agruparlos. Con NOTIFY_VIA_STREAM el consumidor omite los
+            # registros marcados con status_batch
+            changes = [(incident, incident.get("status")) for incident in updated]
+            deliver(grouped_deliveries(changes, new_status, user_id, now))
+
+        return response(200, {
+            "message": f"{len(updated)} de {len(incident_ids)} incidentes actualizados",
+            "new_status": new_status,
+            "results": [{"incident_id": i, "result": results[i]} for i in incident_ids]
+        })
+
+    except Exception as e:
+        return response(500, {"message": f"Error interno: {str(e)}"})
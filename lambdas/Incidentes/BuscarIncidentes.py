@@ -0,0 +1,210 @@
+import heapq
+import itertools
+from collections import Counter
+from datetime import date, datetime, timezone
+from lambdas import db, index_keys, scatter
+from lambdas.utils import response, encode_cursor, decode_cursor, parse_limit
+from lambdas.metrics import instrumentar
+
+VALID_URGENCIES = {"low", "medium", "high", "critical"}
+VALID_STATUSES = {"pending", "in_progress", "completed", "rejected"}
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+# Mayor que cualquier carácter de un timestamp ISO: cota superior de rangos abiertos
+MAX_SUFFIX = "~"
+
+
+def parse_bound(value):
+    """
+    Normaliza un extremo de `from`/`to` al formato de created_at (ISO en UTC).
+    Una fecha sola queda como prefijo del día; un timestamp se pasa a UTC sin
+    el offset para que también funcione como prefijo. ValueError si no es ISO.
+    """
+    if len(value) == 10:
+        return date.fromisoformat(value).isoformat()
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.isoformat()
+
+
+def date_condition(date_from, date_to):
+    # Rango sobre la sort key created_at. `to` es inclusivo: con MAX_SUFFIX
+    # entra todo lo que empieza por él (el día completo si es una fecha sola)
+    if not date_from and not date_to:
+        return None
+    from boto3.dynamodb.conditions import Key
+    if not date_to:
+        return Key("created_at").gte(date_from)
+    if not date_from:
+        return Key("created_at").lte(date_to + MAX_SUFFIX)
+    return Key("created_at").between(date_from, date_to + MAX_SUFFIX)
+
+
+def build_query(floor, urgency, status):
+    """
+    Elige el índice según los filtros recibidos. Todos usan índices con
+    shards ordenados por created_at; lo que no entra en la clave queda como
+    FilterExpression.
+    Devuelve (index_name, atributo de partición, valores, filter_expression).
+    """
+    from boto3.dynamodb.conditions import Attr
+    filters = []
+
+    if floor is not None:
+        index_name, attribute, values = "IncidentsByFloorShard", "floor_shard", index_keys.floor_shards(floor)
+        if urgency:
+            filters.append(Attr("urgency").eq(urgency))
+        if status:
+            filters.append(Attr("status").eq(status))
+    elif urgency:
+        index_name, attribute, values = "IncidentsByUrgencyShard", "urgency_shard", index_keys.urgency_shards(urgency)
+        if status:
+            filters.append(Attr("status").eq(status))
+    else:
+        index_name, attribute, values = "IncidentsByStatusShard", "status_shard", index_keys.status_shards(status)
+
+    filter_expression = None
+    for condition in filters:
+        filter_expression = condition if filter_expression is None else filter_expression & condition
+    return index_name, attribute, values, filter_expression
+
+
+def _start_key(item, attribute):
+    # Clave de un item en el índice: sirve como ExclusiveStartKey
+    return {"incident_id": item["incident_id"], attribute: item[attribute], "created_at": item["created_at"]}
+
+
+def query_partitions(index_name, attribute, values, filter_expression, date_range,
+                     newest_first, limit, start_keys):
+    """
+    Consulta en paralelo cada partición (shard) hasta juntar `limit` items,
+    mezcla por created_at y se queda con los `limit` primeros.
+    `start_keys` es {valor: clave | None}: None = partición terminada,
+    ausente = desde el principio. Devuelve (items, nuevas start_keys).
+    """
+    from boto3.dynamodb.conditions import Key
+    table_name = db.incidents_table().name
+
+    def fetch(value):
+        if value in start_keys and start_keys[value] is None:
+            return [], True
+        key_condition = Key(attribute).eq(value)
+        if date_range is not None:
+            key_condition = key_condition & date_range
+        query_kwargs = {
+            "TableName": table_name,
+            "IndexName": index_name,
+            "KeyConditionExpression": key_condition,
+            "ScanIndexForward": not newest_first,
+            "Limit": limit
+        }
+        if filter_expression is not None:
+            query_kwargs["FilterExpression"] = filter_expression
+        if start_keys.get(value):
+            query_kwargs["ExclusiveStartKey"] = start_keys[value]
+        # Con FilterExpression una página puede venir vacía: se sigue hasta juntar limit
+        items = []
+        while True:
+            resp = db.ddb_client().query(**query_kwargs)
+            items.extend(resp.get("Items", []))
+            if len(items) >= limit:
+                return items[:limit], len(items) == limit and "LastEvaluatedKey" not in resp
+            if "LastEvaluatedKey" not in resp:
+                return items, True
+            query_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+    results = scatter.run_parallel(fetch, values)
+    tagged = [[(item, i) for item in items] for i, (items, _) in enumerate(results)]
+    merged = list(itertools.islice(
+        heapq.merge(*tagged, key=lambda pair: pair[0].get("created_at", ""), reverse=newest_first),
+        limit
+    ))
+
+    # Cada partición avanza hasta el último de sus items que se entregó
+    consumed = Counter(i for _, i in merged)
+    new_keys = {}
+    for i, value in enumerate(values):
+        items, exhausted = results[i]
+        taken = consumed[i]
+        if exhausted and taken == len(items):
+            new_keys[value] = None
+        elif taken:
+            new_keys[value] = _start_key(items[taken - 1], attribute)
+        elif value in start_keys:
+            new_keys[value] = start_keys[value]
+    return [item for item, _ in merged], new_keys
+
+
+@instrumentar
+def lambda_handler(event, context):
+    try:
+        params = event.get("queryStringParameters") or {}
+        floor = params.get("floor")
+        urgency = params.get("urgency")
+        status = params.get("status")
+        date_from = params.get("from")
+        date_to = params.get("to")
+        order = params.get("order", "desc")
+
+        if floor is None and not urgency and not status:
+            return response(400, {"message": "Debe enviar al menos uno de: floor, urgency, status"})
+
+        if floor is not None:
+            try:
+                floor = int(floor)
+            except ValueError:
+                return response(400, {"message": "El floor debe ser un número entero"})
+
+        if urgency and urgency not in VALID_URGENCIES:
+            return response(400, {"message": "valor de urgency inválido"})
+
+        if status and status not in VALID_STATUSES:
+            return response(400, {"message": "valor de status inválido"})
+
+        if order not in ("asc", "desc"):
+            return response(400, {"message": "order debe ser asc o desc"})
+
+        try:
+            date_from = parse_bound(date_from) if date_from else None
+            date_to = parse_bound(date_to) if date_to else None
+        except ValueError:
+            return response(400, {"message": "from y to deben ser fechas ISO 8601"})
+        if date_from and date_to and date_from > date_to + MAX_SUFFIX:
+            return response(400, {"message": "from no puede ser posterior a to"})
+
+        try:
+            limit = parse_limit(params.get("limit"), DEFAULT_LIMIT, MAX_LIMIT)
+            cursor = decode_cursor(params.get("next_token"))
+        except ValueError as e:
+            return response(400, {"message": str(e)})
+
+        index_name, attribute, values, filter_expression = build_query(floor, urgency, status)
+
+        start_keys = {}
+        if cursor:
+            # El cursor solo vale para el mismo índice con el que se generó
+            if cursor.get("index") != index_name or not isinstance(cursor.get("keys"), dict):
+                return response(400, {"message": "next_token no corresponde a estos filtros"})
+            start_keys = cursor["keys"]
+
+        # Más recientes primero por defecto
+        items, new_keys = query_partitions(
+            index_name, attribute, values, filter_expression, date_condition(date_from, date_to),
+            order == "desc", limit, start_keys
+        )
+
+        has_more = any(new_keys.get(value, True) is not None for value in values)
+        next_token = encode_cursor({"index": index_name, "keys": new_keys}) if has_more else None
+
+        return response(200, {
+            "data": [index_keys.public(item) for item in items],
+            "count": len(items),
+            "index": index_name,
+            "next_token": next_token
+        }, event=event)
+
+    except Exception as e:
+        return response(500, {"message": "error interno", "error": str(e)})
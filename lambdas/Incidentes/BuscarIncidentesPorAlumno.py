@@ -1,26 +1,11 @@
-import os
-import json
-import boto3
-from boto3.dynamodb.conditions import Key
-from decimal import Decimal
+from lambdas import db, versions, index_keys, query_cache
 from lambdas.utils import response  # <- importación del conjuro anti-CORS
+from lambdas.metrics import instrumentar
 
-def clean_decimals(obj):
-    if isinstance(obj, list):
-        return [clean_decimals(i) for i in obj]
-    if isinstance(obj, dict):
-        return {k: clean_decimals(v) for k, v in obj.items()}
-    if isinstance(obj, Decimal):
-        if obj % 1 == 0:
-            return int(obj)
-        return float(obj)
-    return obj
-
+@instrumentar
 def lambda_handler(event, context):
     try:
-        table_name = os.environ.get("INCIDENTS_TABLE", "Incidents")
-        dynamodb = boto3.resource("dynamodb")
-        table = dynamodb.Table(table_name)
+        table = db.incidents_table()
 
         params = event.get("queryStringParameters") or {}
         student_id = params.get("student_id")
@@ -28,14 +13,22 @@ def lambda_handler(event, context):
         if not student_id:
             return response(400, {"message": "Debe enviar ?student_id=valor"})
 
-        resp = table.query(
-            IndexName="IncidentsByStudent",
-            KeyConditionExpression=Key("created_by").eq(student_id)
-        )
+        scope = f"student#{student_id}"
+        tag = versions.validator(scope, params)
+        if versions.not_modified(event, tag):
+            return response(304, None, versions.cache_headers(tag))
+
+        def load():
+            from boto3.dynamodb.conditions import Key
+            resp = table.query(
+                IndexName="IncidentsByStudent",
+                KeyConditionExpression=Key("created_by").eq(student_id)
+            )
+            return [index_keys.public(item) for item in resp.get("Items", [])]
 
-        items = clean_decimals(resp.get("Items", []))
+        items = query_cache.cached("by-student", tag, load)
 
-        return response(200, items)
+        return response(200, items, versions.cache_headers(tag), event=event)
 
     except Exception as e:
         return response(500, {"message": "error interno", "error": str(e)})
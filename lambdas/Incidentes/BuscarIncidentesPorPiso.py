@@ -1,27 +1,10 @@
-import os
-import json
-import boto3
-from decimal import Decimal
-from boto3.dynamodb.conditions import Key
+from lambdas import versions, index_keys, scatter, query_cache
 from lambdas.utils import response
+from lambdas.metrics import instrumentar
 
-def clean_decimals(obj):
-    if isinstance(obj, list):
-        return [clean_decimals(i) for i in obj]
-    if isinstance(obj, dict):
-        return {k: clean_decimals(v) for k, v in obj.items()}
-    if isinstance(obj, Decimal):
-        if obj % 1 == 0:
-            return int(obj)
-        return float(obj)
-    return obj
-
+@instrumentar
 def lambda_handler(event, context):
     try:
-        table_name = os.environ.get("INCIDENTS_TABLE", "Incidents")
-        dynamodb = boto3.resource("dynamodb")
-        table = dynamodb.Table(table_name)
-
         params = event.get("queryStringParameters") or {}
         floor = params.get("floor")
 
@@ -33,14 +16,20 @@ def lambda_handler(event, context):
         except ValueError:
             return response(400, {"message": "El floor debe ser un número entero"})
 
-        resp = table.query(
-            IndexName="IncidentsByFloor",
-            KeyConditionExpression=Key("floor").eq(floor_val)
-        )
+        scope = f"floor#{floor_val}"
+        tag = versions.validator(scope, params)
+        if versions.not_modified(event, tag):
+            return response(304, None, versions.cache_headers(tag))
 
-        items = clean_decimals(resp.get("Items", []))
+        # Scatter-gather sobre los shards del piso, más recientes primero
+        # (cacheado por versión: una escritura en el piso lo invalida)
+        items = query_cache.cached("by-floor", tag, lambda: [
+            index_keys.public(item) for item in scatter.query_shards(
+                "IncidentsByFloorShard", "floor_shard", index_keys.floor_shards(floor_val)
+            )
+        ])
 
-        return response(200, items)
+        return response(200, items, versions.cache_headers(tag), event=event)
 
     except Exception as e:
         return response(500, {"message": "error interno", "error": str(e)})
@@ -1,29 +1,12 @@
-import os
-import json
-import boto3
-from boto3.dynamodb.conditions import Key
-from decimal import Decimal
+from lambdas import versions, index_keys, scatter, query_cache
 from lambdas.utils import response
+from lambdas.metrics import instrumentar
 
 VALID_URGENCIES = {"low", "medium", "high", "critical"}
 
-def clean_decimals(obj):
-    if isinstance(obj, list):
-        return [clean_decimals(i) for i in obj]
-    if isinstance(obj, dict):
-        return {k: clean_decimals(v) for k, v in obj.items()}
-    if isinstance(obj, Decimal):
-        if obj % 1 == 0:
-            return int(obj)
-        return float(obj)
-    return obj
-
+@instrumentar
 def lambda_handler(event, context):
     try:
-        table_name = os.environ.get("INCIDENTS_TABLE", "Incidents")
-        dynamodb = boto3.resource("dynamodb")
-        table = dynamodb.Table(table_name)
-
         params = event.get("queryStringParameters") or {}
         urgency = params.get("urgency")
 
@@ -37,14 +20,20 @@ def lambda_handler(event, context):
                 "message": "valor de urgency inválido"
             })
 
-        resp = table.query(
-            IndexName="IncidentsByUrgency",
-            KeyConditionExpression=Key("urgency").eq(urgency)
-        )
+        scope = f"urgency#{urgency}"
+        tag = versions.validator(scope, params)
+        if versions.not_modified(event, tag):
+            return response(304, None, versions.cache_headers(tag))
 
-        items = clean_decimals(resp.get("Items", []))
+        # Scatter-gather sobre los shards de la urgencia, más recientes primero
+        # (cacheado por versión: una escritura en la urgencia lo invalida)
+        items = query_cache.cached("by-urgency", tag, lambda: [
+            index_keys.public(item) for item in scatter.query_shards(
+                "IncidentsByUrgencyShard", "urgency_shard", index_keys.urgency_shards(urgency)
+            )
+        ])
 
-        return response(200, items)
+        return response(200, items, versions.cache_headers(tag), event=event)
 
     except Exception as e:
         return response(500, {
@@ -0,0 +1,80 @@
+from lambdas import db, index_keys, scatter, search
+from lambdas.utils import response, parse_limit
+from lambdas.metrics import instrumentar
+
+VALID_URGENCIES = {"low", "medium", "high", "critical"}
+VALID_STATUSES = {"pending", "in_progress", "completed", "rejected"}
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+MAX_TERMS = 5
+
+
+def find_candidates(terms):
+    """
+    Intersección de las coincidencias por prefijo de cada término (AND),
+    ordenada por created_at descendente.
+    """
+    # Un Query por término, en paralelo
+    results = scatter.run_parallel(search.prefix_matches, terms)
+    ids = set(results[0])
+    for matches in results[1:]:
+        ids &= set(matches)
+    return sorted(ids, key=lambda i: results[0][i], reverse=True)
+
+
+@instrumentar
+def lambda_handler(event, context):
+    try:
+        params = event.get("queryStringParameters") or {}
+        urgency = params.get("urgency")
+        status = params.get("status")
+
+        terms = search.query_terms(params.get("q"))
+        if not terms:
+            return response(400, {"message": "Debe enviar ?q=texto (al menos 2 caracteres)"})
+        if len(terms) > MAX_TERMS:
+            return response(400, {"message": f"Máximo {MAX_TERMS} términos de búsqueda"})
+
+        if urgency and urgency not in VALID_URGENCIES:
+            return response(400, {"message": "valor de urgency inválido"})
+
+        if status and status not in VALID_STATUSES:
+            return response(400, {"message": "valor de status inválido"})
+
+        try:
+            limit = parse_limit(params.get("limit"), DEFAULT_LIMIT, MAX_LIMIT)
+        except ValueError as e:
+            return response(400, {"message": str(e)})
+
+        candidates = find_candidates(terms)
+
+        # Se leen los incidentes por lotes, más recientes primero, hasta
+        # completar `limit` con los filtros de urgencia y estado
+        items = []
+        for start in range(0, len(candidates), db.BATCH_GET_SIZE):
+            chunk = candidates[start:start + db.BATCH_GET_SIZE]
+            found = db.batch_get_incidents(chunk, consistent=False)
+            for incident_id in chunk:
+                incident = found.get(incident_id)
+                if incident is None:
+                    continue
+                if urgency and incident.get("urgency") != urgency:
+                    continue
+                if status and incident.get("status") != status:
+                    continue
+                if not search.matches_all(incident, terms):
+                    continue
+                items.append(index_keys.public(incident))
+            if len(items) >= limit:
+                break
+
+        return response(200, {
+            "data": items[:limit],
+            "count": min(len(items), limit),
+            "terms": terms,
+            "candidates": len(candidates)
+        }, event=event)
+
+    except Exception as e:
+        return response(500, {"message": "error interno", "error": str(e)})
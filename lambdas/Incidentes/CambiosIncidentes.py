@@ -0,0 +1,137 @@
+import os
+import hashlib
+from datetime import datetime, timedelta, timezone
+from lambdas import db, index_keys
+from lambdas.utils import response, encode_cursor, decode_cursor, parse_limit
+from lambdas.metrics import instrumentar
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+# Más atrás de esto conviene recargar todo con /incidents/all
+MAX_DAYS = int(os.environ.get("CHANGES_MAX_DAYS", "30"))
+# Cada consulta relee este margen antes del cursor: cubre escrituras que
+# terminaron después de leer (mismo updated_at o reloj algo atrasado).
+# Lo ya entregado en el margen se descarta con `seen`.
+OVERLAP = timedelta(seconds=int(os.environ.get("CHANGES_OVERLAP_SECONDS", "5")))
+
+
+def _fingerprint(item):
+    raw = f"{item['incident_id']}#{item['updated_at']}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:10]
+
+
+def _parse_time(value):
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def parse_since(value):
+    """
+    `since` puede ser un cursor devuelto antes o un timestamp ISO.
+    Devuelve (momento, huellas ya entregadas).
+    """
+    try:
+        return _parse_time(value), set()
+    except ValueError:
+        pass
+    cursor = decode_cursor(value)
+    if not cursor or "since" not in cursor:
+        raise ValueError("since inválido")
+    try:
+        return _parse_time(cursor["since"]), set(cursor.get("seen", []))
+    except (TypeError, ValueError):
+        raise ValueError("since inválido")
+
+
+def buckets_between(start, end):
+    day = start.date()
+    while day <= end.date():
+        yield day.isoformat()
+        day += timedelta(days=1)
+
+
+def read_changes(start, seen, limit, now):
+    """
+    Recorre los buckets diarios desde `start` en orden de updated_at.
+    Devuelve (items, hay_más).
+    """
+    from boto3.dynamodb.conditions import Key
+    table = db.incidents_table()
+    start_value = start.isoformat()
+    items = []
+    for bucket in buckets_between(start, now):
+        query_kwargs = {
+            "IndexName": "IncidentsByUpdatedBucket",
+            "KeyConditionExpression": Key("updated_bucket").eq(bucket) & Key("updated_at").gte(start_value),
+            "ScanIndexForward": True,
+            "Limit": limit + len(seen) + 1
+        }
+        while True:
+            resp = table.query(**query_kwargs)
+            for item in resp.get("Items", []):
+                if _fingerprint(item) in seen:
+                    continue
+                if len(items) == limit:
+                    return items, True
+                items.append(item)
+            if "LastEvaluatedKey" not in resp:
+                break
+            query_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+    return items, False
+
+
+def next_cursor(since, seen, items, has_more, now):
+    """
+    El nuevo cursor avanza hasta el último cambio entregado (o hasta casi
+    ahora si el cliente quedó al día) y recuerda lo entregado dentro del
+    margen, para no repetirlo en la próxima consulta.
+    """
+    new_since = _parse_time(items[-1]["updated_at"]) if items else since
+    if not has_more:
+        new_since = max(new_since, now - OVERLAP)
+    start = new_since - OVERLAP
+    recent = {_fingerprint(i) for i in items if _parse_time(i["updated_at"]) >= start}
+    # Lo entregado antes tiene updated_at <= since: sigue en el margen solo si start <= since
+    if start <= since:
+        recent |= seen
+    return encode_cursor({"since": new_since.isoformat(), "seen": sorted(recent)})
+
+
+@instrumentar
+def lambda_handler(event, context):
+    try:
+        params = event.get("queryStringParameters") or {}
+        now = datetime.now(timezone.utc)
+
+        try:
+            limit = parse_limit(params.get("limit"), DEFAULT_LIMIT, MAX_LIMIT)
+            since_value = params.get("since")
+            if not since_value:
+                # Sin cursor: el cliente acaba de cargar todo y empieza a seguir desde ahora
+                return response(200, {
+                    "data": [],
+                    "count": 0,
+                    "has_more": False,
+                    "next_cursor": encode_cursor({"since": now.isoformat(), "seen": []})
+                })
+            since, seen = parse_since(since_value)
+        except ValueError as e:
+            return response(400, {"message": str(e)})
+
+        if now - since > timedelta(days=MAX_DAYS):
+            return response(410, {"message": f"El cursor tiene más de {MAX_DAYS} días, recargar con /incidents/all"})
+
+        items, has_more = read_changes(since - OVERLAP, seen, limit, now)
+        cursor = next_cursor(since, seen, items, has_more, now)
+
+        return response(200, {
+            "data": [index_keys.public(item) for item in items],
+            "count": len(items),
+            "has_more": has_more,
+            "next_cursor": cursor
+        }, event=event)
+
+    except Exception as e:
+        return response(500, {"message": "error interno", "error": str(e)})
@@ -1,30 +1,107 @@
 # lambda_function.py
-import os, json, uuid, time
-import boto3
+import uuid, time
 from datetime import datetime, timezone
-from WebSocket.notify import notify_admins
-from lambdas.utils import response
+from WebSocket import messages
+from WebSocket.notify import notify_admins, NOTIFY_VIA_STREAM
+from lambdas import db, versions, history, index_keys, stats, users, search, duplicates
+from lambdas.utils import response, parse_body
+from lambdas.metrics import instrumentar
 
-ddb = boto3.resource('dynamodb')
-table = ddb.Table("Incidents")
-users_table = ddb.Table(os.environ["USERS_TABLE"])
-INCIDENT_TYPE_LABELS = {
-    'infrastructure': 'Infraestructura',
-    'electric_failure': 'Falla Eléctrica',
-    'water_failure': 'Falla de Agua',
-    'security': 'Seguridad',
-    'cleaning': 'Limpieza',
-    'technology': 'Tecnología',
-    'other': 'Otro'
-}
+# Posición del Put del marcador en la transacción de creación
+MARKER_OP = 2
 
+
+def report_again(incident, user_id, by_name, now):
+    """
+    Suma el reporte al incidente abierto del mismo lugar ("yo también").
+    Devuelve el incidente actualizado, o None si ya se cerró.
+    """
+    # Incremento atómico sin bloqueo optimista: los reportes simultáneos se
+    # suman todos. Sin report_count el incidente tenía un solo reporte.
+    update_expr = ("SET report_count = if_not_exists(report_count, :one) + :one, "
+                   "last_reported_by_name = :name, updated_at = :now, updated_bucket = :ub")
+    expr_values = {
+        ":one": 1,
+        ":name": by_name,
+        ":now": now,
+        ":ub": index_keys.updated_bucket(now),
+        ":pending": "pending",
+        ":in_progress": "in_progress"
+    }
+    if messages.has_reporter({"created_by": user_id}):
+        update_expr += " ADD reporters :me"
+        expr_values[":me"] = {user_id}
+    try:
+        updated = db.incidents_table().update_item(
+            Key={"incident_id": incident["incident_id"]},
+            UpdateExpression=update_expr,
+            # Solo se suma a incidentes abiertos
+            ConditionExpression="#s IN (:pending, :in_progress)",
+            ExpressionAttributeNames={"#s": "status"},
+            ExpressionAttributeValues=expr_values,
+            ReturnValues="ALL_NEW"
+        )["Attributes"]
+    except db.ddb_client().exceptions.ConditionalCheckFailedException:
+        return None
+    try:
+        db.history_table().put_item(
+            Item=history.entry(incident["incident_id"], "reported_again", user_id, now, by_name=by_name)
+        )
+    except Exception as e:
+        print(f"Error registrando historial de {incident['incident_id']}: {str(e)}")
+    return updated
+
+
+def add_report(incident, user_id, by_name, now):
+    """
+    Respuesta agrupada para un reporte repetido, o None si el incidente se
+    cerró desde la lectura (el reporte debe crear uno nuevo).
+    """
+    if duplicates.already_reported(incident, user_id):
+        return coalesced_response(incident, "Ya habías reportado este incidente")
+    updated = report_again(incident, user_id, by_name, now)
+    if updated is None:
+        return None
+    versions.bump(versions.scopes_for(updated))
+    if not NOTIFY_VIA_STREAM and duplicates.should_notify(updated["report_count"]):
+        notify_admins(messages.reportes_adicionales(updated, by_name, now))
+    return coalesced_response(updated, "El incidente ya estaba reportado, se sumó tu reporte")
+
+
+def coalesced_response(incident, message):
+    return response(200, {
+        "success": True,
+        "coalesced": True,
+        "message": message,
+        "data": {
+            "incident_id": incident["incident_id"],
+            "type": incident["type"],
+            "floor": incident["floor"],
+            "ambient": incident["ambient"],
+            "description": incident["description"],
+            "urgency": incident["urgency"],
+            "status": incident["status"],
+            "created_by": incident["created_by"],
+            "created_at": incident["created_at"],
+            "updated_at": incident["updated_at"],
+            "reported_by_name": incident.get("reported_by_name"),
+            "report_count": int(incident.get("report_count", 1))
+        }})
+
+
+@instrumentar
 def lambda_handler(event, context):
-    body = json.loads(event.get('body', '{}'))
+    body = parse_body(event)
     # validate simple
     if 'type' not in body or 'description' not in body:
         return response(400, {"message": "type and description required"})
     if body.get('urgency') not in ('low','medium','high','critical'):
         return response(400, {"message": "invalid urgency"})
+    try:
+        # Entero: es parte de la clave del índice por piso (floor_shard)
+        floor = int(body.get('floor'))
+    except (TypeError, ValueError):
+        return response(400, {"message": "floor must be an integer"})
 
     incident_id = uuid.uuid4().hex
     now = datetime.now(timezone.utc).isoformat()
@@ -32,13 +109,10 @@ def lambda_handler(event, context):
     reported_by_name = "Usuario Desconocido"
     try:
         if created_by != 'unknown':
-            user_response = users_table.get_item(Key={"user_id": created_by})
-            if "Item" in user_response:
-                user = user_response["Item"]
-                # Construir nombre completo
-                nombre = user.get("nombre", user.get("nombres", ""))
-                apellidos = user.get("apellidos", "")
-                reported_by_name = f"{nombre} {apellidos}".strip() or user.get("correo", "Usuario")
+            # Perfil cacheado en el contenedor (incluye búsquedas negativas)
+            user = users.get_user(created_by)
+            if user is not None:
+                reported_by_name = users.display_name(user)
     except Exception as e:
         print(f"Error obteniendo usuario: {str(e)}")
         # Si falla, usar correo o user_id
@@ -46,7 +120,7 @@ def lambda_handler(event, context):
     item = {
         "incident_id": incident_id,
         "type": body['type'],
-        "floor": body['floor'],
+        "floor": floor,
         "ambient": body['ambient'],
         "description": body['description'],
         "urgency": body.get('urgency', 'low'),
@@ -55,27 +129,57 @@ def lambda_handler(event, context):
         "reported_by_name": reported_by_name,
         "created_at": now,
         "updated_at": now,
-        "history": [{
-            "action":"created",
-            "by": body.get('created_by','unknown'), 
-            "by_name": reported_by_name,
-            "at": now}]
-    }
-    table.put_item(Item=item)
-    incident_type_label = INCIDENT_TYPE_LABELS.get(item["type"], "Incidente")
-    
-    message = {
-        "tipo": "nuevo_incidente",
-        "incident_id": incident_id,
-        "tipo_incidente": incident_type_label, 
-        "descripcion": item["description"],
-        "urgencia": item["urgency"],
-        "estado": item["status"],
-        "piso": item["floor"],
-        "ambiente": item["ambient"],
-        "reportado_por": reported_by_name
+        "updated_bucket": index_keys.updated_bucket(now),
+        "urgency_shard": index_keys.urgency_shard(body.get('urgency', 'low'), incident_id),
+        "floor_shard": index_keys.floor_shard(floor, incident_id),
+        "status_shard": index_keys.status_shard("pending", incident_id)
     }
-    notify_admins(message)
+    transact_items = [
+        {"Put": {
+            "TableName": db.incidents_table().name,
+            "Item": item,
+            "ConditionExpression": "attribute_not_exists(incident_id)"
+        }},
+        history.put_op(history.entry(incident_id, "created", created_by, now, by_name=reported_by_name))
+    ]
+
+    if not duplicates.enabled():
+        # Incidente y primera entrada del historial en una sola transacción
+        db.transact_write(transact_items)
+    else:
+        # Mismo tipo, piso y ambiente con un incidente abierto reciente: se
+        # suma el reporte a ese incidente en lugar de crear otro
+        key = duplicates.marker_key(item["type"], item["floor"], item["ambient"])
+        marker, existing = duplicates.find(key)
+        if existing is not None:
+            coalesced = add_report(existing, created_by, reported_by_name, now)
+            if coalesced is not None:
+                return coalesced
+
+        # El marcador va en la misma transacción: si otro reporte igual se
+        # adelantó, la transacción se cancela y se suma a ese incidente
+        stale_id = marker.get("incident_id") if marker else None
+        claim = duplicates.claim_op(key, incident_id, time.time(), stale_id)
+        try:
+            db.transact_write(transact_items + [claim])
+        except db.ddb_client().exceptions.TransactionCanceledException as e:
+            reasons = e.response.get("CancellationReasons") or []
+            if len(reasons) <= MARKER_OP or reasons[MARKER_OP].get("Code") != "ConditionalCheckFailed":
+                raise
+            _, existing = duplicates.find(key)
+            coalesced = add_report(existing, created_by, reported_by_name, now) if existing else None
+            if coalesced is not None:
+                return coalesced
+            # Ese incidente ya se cerró: este se crea sin marcador
+            db.transact_write(transact_items)
+
+    stats.apply(stats.diff(None, item))
+    versions.bump(versions.scopes_for(item))
+    search.index_incident(item)
+
+    # Con NOTIFY_VIA_STREAM el aviso lo envía el consumidor del stream
+    if not NOTIFY_VIA_STREAM:
+        notify_admins(messages.nuevo_incidente(item))
     return response(201, {
         "success": True,
         "message": "Incidente creado exitosamente",
@@ -1,44 +1,38 @@
-import os
-import json
-import boto3
 from datetime import datetime, timezone
-from WebSocket.notify import notify_user
-
-from lambdas.utils import response
-
-ddb = boto3.resource("dynamodb")
-table = ddb.Table(os.environ["INCIDENTS_TABLE"])
-INCIDENT_TYPE_LABELS = {
-    'infrastructure': 'Infraestructura',
-    'electric_failure': 'Falla Eléctrica',
-    'water_failure': 'Falla de Agua',
-    'security': 'Seguridad',
-    'cleaning': 'Limpieza',
-    'technology': 'Tecnología',
-    'other': 'Otro'
-}
-
-FIELD_LABELS = {
-    'type': 'tipo',
-    'description': 'descripción',
-    'floor': 'piso',
-    'ambient': 'ambiente',
-    'urgency': 'urgencia'
-}
+from WebSocket import messages
+from WebSocket.notify import notify_user, NOTIFY_VIA_STREAM
+
+from lambdas import db, versions, index_keys, stats, search, duplicates
+from lambdas.utils import response, parse_body
+from lambdas.auth import requiere_auth
+from lambdas.metrics import instrumentar
 
 EDITABLE_FIELDS = ["type", "description", "floor", "ambient", "urgency"]
+VALID_URGENCIES = {"low", "medium", "high", "critical"}
+
+ROLES_AUTORIZADOS = ["Personal administrativo", "Autoridad"]
 
+@instrumentar
+@requiere_auth(roles=ROLES_AUTORIZADOS)
 def lambda_handler(event, context):
     try:
-        body = event.get("body")
-        if isinstance(body, str):
-            body = json.loads(body)
+        table = db.incidents_table()
+
+        body = parse_body(event)
 
         incident_id = body.get("incident_id")
-        admin_user_id = body.get("admin_user_id") 
         if not incident_id:
             return response(400, {"message": "incident_id requerido"})
 
+        # Piso y urgencia son parte de las claves de los índices con shards
+        if "floor" in body:
+            try:
+                body["floor"] = int(body["floor"])
+            except (TypeError, ValueError):
+                return response(400, {"message": "El floor debe ser un número entero"})
+        if "urgency" in body and body["urgency"] not in VALID_URGENCIES:
+            return response(400, {"message": "valor de urgency inválido"})
+
         # obtener incidente
         resp = table.get_item(Key={"incident_id": incident_id})
         if "Item" not in resp:
@@ -67,40 +61,64 @@ def lambda_handler(event, context):
         if not update_expr:
             return response(400, {"message": "No hay campos válidos para actualizar"})
 
+        # Claves de los índices sharded por urgencia y piso
+        if "urgency" in body:
+            update_expr.append("urgency_shard = :urgency_shard")
+            expr_values[":urgency_shard"] = index_keys.urgency_shard(body["urgency"], incident_id)
+        if "floor" in body:
+            update_expr.append("floor_shard = :floor_shard")
+            expr_values[":floor_shard"] = index_keys.floor_shard(body["floor"], incident_id)
+
         now = datetime.now(timezone.utc).isoformat()
         update_expr.append("updated_at = :now")
         expr_values[":now"] = now
-
-        table.update_item(
-            Key={"incident_id": incident_id},
-            UpdateExpression="SET " + ", ".join(update_expr),
-            ExpressionAttributeNames=expr_names,
-            ExpressionAttributeValues=expr_values
-        )
+        update_expr.append("updated_bucket = :ub")
+        expr_values[":ub"] = index_keys.updated_bucket(now)
+        update_expr.append("updated_by = :by")
+        expr_values[":by"] = event["claims"]["user_id"]
+
+        updated = {**incident, **{f: body[f] for f in EDITABLE_FIELDS if f in body}}
+        deltas = stats.diff(incident, updated)
+
+        update_kwargs = {
+            "Key": {"incident_id": incident_id},
+            "UpdateExpression": "SET " + ", ".join(update_expr),
+            "ExpressionAttributeNames": expr_names,
+            "ExpressionAttributeValues": expr_values
+        }
+        if deltas:
+            # Cambió piso o urgencia: los contadores se ajustan después del
+            # update. La condición sobre los valores leídos evita descontar
+            # dos veces si otro cambio de piso/urgencia/estado se adelantó
+            update_kwargs["ConditionExpression"] = "#c_floor = :old_floor AND #c_urgency = :old_urgency AND #c_status = :old_status"
+            expr_names.update({"#c_floor": "floor", "#c_urgency": "urgency", "#c_status": "status"})
+            expr_values.update({
+                ":old_floor": incident.get("floor"),
+                ":old_urgency": incident.get("urgency"),
+                ":old_status": incident.get("status")
+            })
+            try:
+                table.update_item(**update_kwargs)
+            except db.ddb_client().exceptions.ConditionalCheckFailedException:
+                return response(409, {"message": "El incidente fue modificado por otro usuario, intente nuevamente"})
+            stats.apply(deltas)
+        else:
+            table.update_item(**update_kwargs)
+
+        # Si cambió piso o urgencia, cambian las listas de origen y de destino
+        versions.bump(versions.scopes_for(incident) + versions.scopes_for(updated))
+        if any(f in body for f in search.SEARCH_FIELDS):
+            search.index_incident(updated, incident)
+        # Los reportes repetidos del lugar anterior ya no deben sumarse a este incidente
+        if duplicates.enabled() and duplicates.incident_key(updated) != duplicates.incident_key(incident):
+            duplicates.release(incident)
 
 
         # Notificación 3: Admin actualizó el incidente → notificar al estudiante
-        if created_by and created_by != "unknown":
-            # Obtener el tipo de incidente actualizado o usar el existente
-            incident_type = body.get("type", incident.get("type"))
-            incident_type_label = INCIDENT_TYPE_LABELS.get(incident_type, "Incidente")
-            
-            # Convertir campos actualizados a etiquetas legibles
+        # (con NOTIFY_VIA_STREAM la envía el consumidor del stream)
+        if not NOTIFY_VIA_STREAM and messages.has_reporter(incident):
             updated_fields = [key for key in body.keys() if key in EDITABLE_FIELDS]
-            updated_fields_labels = [FIELD_LABELS.get(f, f) for f in updated_fields]
-            
-            message = {
-                "tipo": "incidente_editado",
-                "incident_id": incident_id,
-                "tipo_incidente": incident_type_label,  
-                "piso": body.get("floor", incident.get("floor")),      
-                "ambiente": body.get("ambient", incident.get("ambient")), 
-                "mensaje": "Un administrador ha actualizado tu incidente",
-                "campos_actualizados": updated_fields,  
-                "campos_actualizados_labels": updated_fields_labels,  
-                "timestamp": now
-            }
-            notify_user(message, created_by)
+            notify_user(messages.incidente_editado(updated, updated_fields, now), created_by)
 
         
         return response(
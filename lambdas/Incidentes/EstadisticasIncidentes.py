@@ -0,0 +1,14 @@
+from lambdas import db, stats
+from lambdas.utils import response
+from lambdas.metrics import instrumentar
+
+@instrumentar
+def lambda_handler(event, context):
+    try:
+        # Un solo GetItem sobre los contadores materializados
+        resp = db.meta_table().get_item(Key=stats.STATS_KEY)
+
+        return response(200, stats.summarize(resp.get("Item")))
+
+    except Exception as e:
+        return response(500, {"message": "error interno", "error": str(e)})
@@ -0,0 +1,248 @@
+import os
+import io
+import csv
+import json
+import time
+import queue
+import argparse
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from lambdas import db
+from lambdas.utils import dumps
+from lambdas.metrics import instrumentar
+
+DEFAULT_SEGMENTS = int(os.environ.get("EXPORT_SEGMENTS", "4"))
+# Chunks pendientes de escribir; acota la memoria usada por el export
+MAX_PENDING_CHUNKS = 16
+# S3 exige partes de al menos 5 MiB (excepto la última)
+S3_PART_SIZE = 8 * 1024 * 1024
+
+CSV_FIELDS = [
+    "incident_id", "type", "floor", "ambient", "description", "urgency",
+    "status", "created_by", "reported_by_name", "created_at", "updated_at"
+]
+
+_DONE = object()
+
+
+class FileSink:
+    def __init__(self, path):
+        self.path = path
+        self._f = open(path, "wb")
+
+    def write(self, data):
+        self._f.write(data)
+
+    def close(self):
+        self._f.close()
+
+    def abort(self):
+        self._f.close()
+
+
+class S3Sink:
+    """
+    Sube el export por partes (multipart upload) a un bucket S3 o compatible,
+    sin mantener el archivo completo en memoria.
+    """
+    def __init__(self, bucket, key, endpoint_url=None):
+        self.bucket = bucket
+        self.key = key
+        self.s3 = db.client("s3", endpoint_url=endpoint_url)
+        self.buffer = bytearray()
+        self.upload_id = None
+        self.parts = []
+
+    def write(self, data):
+        self.buffer.extend(data)
+        if len(self.buffer) >= S3_PART_SIZE:
+            self._flush_part()
+
+    def _flush_part(self):
+        if self.upload_id is None:
+            resp = self.s3.create_multipart_upload(Bucket=self.bucket, Key=self.key)
+            self.upload_id = resp["UploadId"]
+        part_number = len(self.parts) + 1
+        resp = self.s3.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=bytes(self.buffer)
+        )
+        self.parts.append({"ETag": resp["ETag"], "PartNumber": part_number})
+        self.buffer = bytearray()
+
+    def close(self):
+        # Export pequeño: basta con un put_object
+        if self.upload_id is None:
+            self.s3.put_object(Bucket=self.bucket, Key=self.key, Body=bytes(self.buffer))
+            return
+        if self.buffer:
+            self._flush_part()
+        self.s3.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": self.parts}
+        )
+
+    def abort(self):
+        if self.upload_id is not None:
+            self.s3.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+
+
+def serialize_chunk(items, fmt):
+    if fmt == "ndjson":
+        return "".join(dumps(item) + "\n" for item in items).encode()
+
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=CSV_FIELDS, extrasaction="ignore")
+    # str(Decimal) ya es la representación numérica correcta para CSV
+    writer.writerows(items)
+    return buf.getvalue().encode()
+
+
+def scan_segment(table_name, segment, total_segments, fmt, chunks, stats):
+    # Los recursos de boto3 no son thread-safe, los clientes sí: todos los
+    # segmentos comparten el cliente (y su pool de conexiones)
+    client = db.ddb_client()
+    started = time.perf_counter()
+    count = 0
+    scan_kwargs = {"TableName": table_name, "Segment": segment, "TotalSegments": total_segments}
+
+    while True:
+        resp = client.scan(**scan_kwargs)
+        items = resp.get("Items", [])
+        if items:
+            count += len(items)
+            # put bloquea si el escritor va atrasado (backpressure)
+            chunks.put(serialize_chunk(items, fmt))
+        if "LastEvaluatedKey" not in resp:
+            break
+        scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+    elapsed = time.perf_counter() - started
+    stats[segment] = {
+        "segment": segment,
+        "items": count,
+        "seconds": round(elapsed, 3),
+        "items_per_second": round(count / elapsed, 1) if elapsed > 0 else 0.0
+    }
+
+
+def export_incidents(sink, fmt="ndjson", total_segments=DEFAULT_SEGMENTS, table_name=None):
+    """
+    Recorre toda la tabla de incidentes con un scan paralelo y escribe el
+    resultado en `sink` por chunks (una página de DynamoDB por chunk).
+    Devuelve las estadísticas por segmento.
+    """
+    if fmt not in ("ndjson", "csv"):
+        raise ValueError("format debe ser ndjson o csv")
+    if total_segments < 1:
+        raise ValueError("segments debe ser mayor que 0")
+
+    table_name = table_name or os.environ.get("INCIDENTS_TABLE", "Incidents")
+    chunks = queue.Queue(maxsize=MAX_PENDING_CHUNKS)
+    stats = {}
+    errors = []
+
+    def writer():
+        while True:
+            chunk = chunks.get()
+            if chunk is _DONE:
+                return
+            if not errors:
+                try:
+                    sink.write(chunk)
+                except Exception as e:
+                    # Se siguen consumiendo chunks para no bloquear a los segmentos
+                    errors.append(e)
+
+    if fmt == "csv":
+        buf = io.StringIO()
+        csv.DictWriter(buf, fieldnames=CSV_FIELDS).writeheader()
+        sink.write(buf.getvalue().encode())
+
+    writer_thread = threading.Thread(target=writer, daemon=True)
+    writer_thread.start()
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=total_segments) as pool:
+            futures = [
+                pool.submit(scan_segment, table_name, segment, total_segments, fmt, chunks, stats)
+                for segment in range(total_segments)
+            ]
+            for future in futures:
+                future.result()
+    except Exception as e:
+        errors.append(e)
+    finally:
+        chunks.put(_DONE)
+        writer_thread.join()
+
+    if errors:
+        sink.abort()
+        raise errors[0]
+    sink.close()
+
+    elapsed = time.perf_counter() - started
+    total_items = sum(s["items"] for s in stats.values())
+    summary = {
+        "format": fmt,
+        "total_segments": total_segments,
+        "items": total_items,
+        "seconds": round(elapsed, 3),
+        "items_per_second": round(total_items / elapsed, 1) if elapsed > 0 else 0.0,
+        "segments": [stats[s] for s in sorted(stats)]
+    }
+    print(json.dumps(summary))
+    return summary
+
+
+@instrumentar
+def lambda_handler(event, context):
+    """
+    Export mensual. Parámetros opcionales en el evento:
+    format (ndjson|csv), segments, bucket, key.
+    """
+    event = event or {}
+    fmt = event.get("format", "ndjson")
+    total_segments = int(event.get("segments", DEFAULT_SEGMENTS))
+    bucket = event.get("bucket") or os.environ.get("EXPORT_BUCKET")
+    if not bucket:
+        return {"statusCode": 400, "body": json.dumps({"message": "bucket requerido (EXPORT_BUCKET)"})}
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    key = event.get("key") or f"exports/incidents-{stamp}.{fmt}"
+    sink = S3Sink(bucket, key, endpoint_url=os.environ.get("EXPORT_S3_ENDPOINT") or None)
+
+    try:
+        summary = export_incidents(sink, fmt=fmt, total_segments=total_segments)
+    except ValueError as e:
+        return {"statusCode": 400, "body": json.dumps({"message": str(e)})}
+
+    summary["location"] = f"s3://{bucket}/{key}"
+    return {"statusCode": 200, "body": json.dumps(summary)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta todos los incidentes con un scan paralelo")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--segments", type=int, default=DEFAULT_SEGMENTS)
+    parser.add_argument("--output", help="archivo local de salida")
+    parser.add_argument("--bucket", help="bucket S3 (o compatible) de salida")
+    parser.add_argument("--key", help="key del objeto en el bucket")
+    parser.add_argument("--endpoint-url", help="endpoint S3 compatible (MinIO, etc.)")
+    args = parser.parse_args()
+
+    if args.output:
+        out = FileSink(args.output)
+    elif args.bucket and args.key:
+        out = S3Sink(args.bucket, args.key, endpoint_url=args.endpoint_url)
+    else:
+        parser.error("usar --output o --bucket y --key")
+
+    export_incidents(out, fmt=args.format, total_segments=args.segments)
@@ -1,32 +1,74 @@
-import os
-import json
-import boto3
-from decimal import Decimal
-from lambdas.utils import response
-
-def clean_decimals(obj):
-    if isinstance(obj, list):
-        return [clean_decimals(i) for i in obj]
-    if isinstance(obj, dict):
-        return {k: clean_decimals(v) for k, v in obj.items()}
-    if isinstance(obj, Decimal):
-        if obj % 1 == 0:
-            return int(obj)
-        return float(obj)
-    return obj
+from lambdas import db, versions, index_keys, query_cache
+from lambdas.utils import response, encode_cursor, decode_cursor, parse_limit
+from lambdas.metrics import instrumentar
 
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+# Campos que el cliente puede pedir con ?fields=a,b,c
+PROJECTABLE_FIELDS = [
+    "incident_id", "type", "floor", "ambient", "description", "urgency",
+    "status", "created_by", "reported_by_name", "created_at", "updated_at",
+    # Ausente = un solo reporte (ver lambdas/duplicates.py)
+    "report_count"
+]
+# El historial se pagina aparte en /incidents/history
+DEFAULT_FIELDS = PROJECTABLE_FIELDS
+
+def parse_fields(value):
+    if not value:
+        return DEFAULT_FIELDS
+    fields = [f.strip() for f in value.split(",") if f.strip()]
+    invalid = [f for f in fields if f not in PROJECTABLE_FIELDS]
+    if invalid:
+        raise ValueError(f"Campos inválidos en fields: {', '.join(invalid)}")
+    # incident_id siempre se incluye para que el cliente pueda identificar el item
+    if "incident_id" not in fields:
+        fields.insert(0, "incident_id")
+    return fields
+
+@instrumentar
 def lambda_handler(event, context):
     try:
-        table_name = os.environ.get("INCIDENTS_TABLE", "Incidents")
-        dynamodb = boto3.resource("dynamodb")
-        table = dynamodb.Table(table_name)
+        table = db.incidents_table()
+
+        params = event.get("queryStringParameters") or {}
+
+        try:
+            limit = parse_limit(params.get("limit"), DEFAULT_LIMIT, MAX_LIMIT)
+            fields = parse_fields(params.get("fields"))
+            start_key = decode_cursor(params.get("next_token"))
+        except ValueError as e:
+            return response(400, {"message": str(e)})
+
+        scope = "all"
+        tag = versions.validator(scope, params)
+        if versions.not_modified(event, tag):
+            return response(304, None, versions.cache_headers(tag))
+
+        # Nombres con alias: status, type, history... son palabras reservadas
+        scan_kwargs = {
+            "Limit": limit,
+            "ProjectionExpression": ", ".join(f"#p{i}" for i in range(len(fields))),
+            "ExpressionAttributeNames": {f"#p{i}": f for i, f in enumerate(fields)}
+        }
+        if start_key:
+            scan_kwargs["ExclusiveStartKey"] = start_key
 
-        # SCAN para obtener todos los incidentes
-        resp = table.scan()
+        def load():
+            # Una sola página acotada por limit; el cliente sigue con next_token
+            resp = table.scan(**scan_kwargs)
+            items = [index_keys.public(item) for item in resp.get("Items", [])]
+            return {
+                "data": items,
+                "count": len(items),
+                "next_token": encode_cursor(resp.get("LastEvaluatedKey"))
+            }
 
-        items = clean_decimals(resp.get("Items", []))
+        # El tag incluye limit, fields y next_token: cada página es una entrada
+        body = query_cache.cached("all", tag, load)
 
-        return response(200, items)
+        return response(200, body, versions.cache_headers(tag), event=event)
 
     except Exception as e:
         return response(500, {
@@ -0,0 +1,48 @@
+from lambdas import db
+from lambdas.utils import response, encode_cursor, decode_cursor, parse_limit
+from lambdas.metrics import instrumentar
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+@instrumentar
+def lambda_handler(event, context):
+    try:
+        table = db.history_table()
+
+        params = event.get("queryStringParameters") or {}
+        incident_id = params.get("incident_id")
+
+        if not incident_id:
+            return response(400, {"message": "Debe enviar ?incident_id=valor"})
+
+        order = params.get("order", "asc")
+        if order not in ("asc", "desc"):
+            return response(400, {"message": "order debe ser asc o desc"})
+
+        try:
+            limit = parse_limit(params.get("limit"), DEFAULT_LIMIT, MAX_LIMIT)
+            start_key = decode_cursor(params.get("next_token"))
+        except ValueError as e:
+            return response(400, {"message": str(e)})
+
+        from boto3.dynamodb.conditions import Key
+        query_kwargs = {
+            "KeyConditionExpression": Key("incident_id").eq(incident_id),
+            "ScanIndexForward": order == "asc",
+            "Limit": limit
+        }
+        if start_key:
+            query_kwargs["ExclusiveStartKey"] = start_key
+
+        resp = table.query(**query_kwargs)
+        items = resp.get("Items", [])
+
+        return response(200, {
+            "data": items,
+            "count": len(items),
+            "next_token": encode_cursor(resp.get("LastEvaluatedKey"))
+        }, event=event)
+
+    except Exception as e:
+        return response(500, {"message": "error interno", "error": str(e)})
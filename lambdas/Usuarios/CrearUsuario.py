@@ -1,28 +1,25 @@
-import boto3
 import hashlib
 import uuid
 import re
-import json
 import os
-from lambdas.utils import response
+from lambdas import db
+from lambdas.users import correo_marker, dni_marker
+from lambdas.utils import response, parse_body
+from lambdas.metrics import instrumentar
 
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
 ROLES_VALIDOS = ["Estudiante", "Personal administrativo", "Autoridad"]
 
+@instrumentar
 def lambda_handler(event, context):
-    dynamodb = boto3.resource('dynamodb')
     table_name = os.environ["USERS_TABLE"]
-    table = dynamodb.Table(table_name)
 
     try:
         # Obtener y parsear el body
-        body = event.get("body")
-
-        # API Gateway envía el body como string
-        if isinstance(body, str):
-            body = json.loads(body)
+        # API Gateway envía el body como string (o base64)
+        body = parse_body(event)
 
         # Si sigue sin ser dict → error
         if not isinstance(body, dict):
@@ -54,22 +51,6 @@ def lambda_handler(event, context):
         if rol not in ROLES_VALIDOS:
             return response(400, {"message": "Rol inválido. Roles permitidos: Estudiante, Personal administrativo, Autoridad"})
 
-        # Validar correo único
-        resp_correo = table.scan(
-            FilterExpression="correo = :correo",
-            ExpressionAttributeValues={":correo": correo}
-        )
-        if resp_correo["Count"] > 0:
-            return response(409, {"message": "El correo ya está registrado"})
-
-        # Validar DNI único
-        resp_dni = table.scan(
-            FilterExpression="dni = :dni",
-            ExpressionAttributeValues={":dni": dni}
-        )
-        if resp_dni["Count"] > 0:
-            return response(409, {"message": "El DNI ya está registrado"})
-
         # Crear usuario
         user_id = str(uuid.uuid4())
         hashed_pwd = hash_password(password)
@@ -84,7 +65,35 @@ def lambda_handler(event, context):
             "rol": rol
         }
 
-        table.put_item(Item=item)
+        # Usuario + marcadores de unicidad (correo y DNI) en una sola transacción:
+        # si otro registro ya tomó el correo o el DNI, la transacción se cancela
+        try:
+            db.ddb_client().transact_write_items(
+                TransactItems=[
+                    {"Put": {
+                        "TableName": table_name,
+                        "Item": item,
+                        "ConditionExpression": "attribute_not_exists(user_id)"
+                    }},
+                    {"Put": {
+                        "TableName": table_name,
+                        "Item": {"user_id": correo_marker(correo), "owner_id": user_id},
+                        "ConditionExpression": "attribute_not_exists(user_id)"
+                    }},
+                    {"Put": {
+                        "TableName": table_name,
+                        "Item": {"user_id": dni_marker(dni), "owner_id": user_id},
+                        "ConditionExpression": "attribute_not_exists(user_id)"
+                    }}
+                ]
+            )
+        except db.ddb_client().exceptions.TransactionCanceledException as e:
+            reasons = [r.get("Code") for r in e.response.get("CancellationReasons", [])]
+            if len(reasons) > 1 and reasons[1] == "ConditionalCheckFailed":
+                return response(409, {"message": "El correo ya está registrado"})
+            if len(reasons) > 2 and reasons[2] == "ConditionalCheckFailed":
+                return response(409, {"message": "El DNI ya está registrado"})
+            raise
 
         return response(200, {
             "message": "Usuario registrado correctamente",
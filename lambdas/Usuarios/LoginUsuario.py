@@ -1,19 +1,18 @@
-import boto3
 import hashlib
-import uuid
-import json
 import os
-import jwt
 from datetime import datetime, timedelta
-from lambdas.utils import response
+from lambdas import db
+from lambdas.utils import response, parse_body
+from lambdas.metrics import instrumentar
 
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
+@instrumentar
 def lambda_handler(event, context):
     try:
         # Parsear body
-        body = json.loads(event.get("body", "{}"))
+        body = parse_body(event)
 
         correo = body.get("correo")
         password = body.get("password")
@@ -23,26 +22,29 @@ def lambda_handler(event, context):
 
         hashed_password = hash_password(password)
 
-        # Conectar DynamoDB
-        dynamodb = boto3.resource("dynamodb")
-        table = dynamodb.Table(os.environ["USERS_TABLE"])
+        from boto3.dynamodb.conditions import Key
+        table = db.users_table()
 
-        # Buscar por correo (porque no es PK)
-        resp = table.scan(
-            FilterExpression="correo = :correo",
-            ExpressionAttributeValues={":correo": correo}
+        # Buscar por correo en el GSI (un solo Query, sin scan)
+        resp = table.query(
+            IndexName="UsersByCorreo",
+            KeyConditionExpression=Key("correo").eq(correo)
         )
 
         if resp["Count"] == 0:
             return response(403, {"error": "Usuario no existe"})
 
-        usuario = resp["Items"][0]
+        # Cuentas creadas antes de los marcadores de unicidad pueden compartir
+        # correo (ver `python -m lambdas.users --backfill-markers`): vale la
+        # que corresponde a la contraseña
+        usuario = next((u for u in resp["Items"] if u["password"] == hashed_password), None)
 
         # Validar contraseña
-        if hashed_password != usuario["password"]:
+        if usuario is None:
             return response(403, {"error": "Password incorrecto"})
 
-        # GENERAR JWT
+        # GENERAR JWT (PyJWT solo se importa si el login es válido)
+        import jwt
         secret = os.environ["JWT_SECRET"]
 
         payload = {
@@ -0,0 +1,109 @@
+import os
+import time
+import functools
+from lambdas.utils import response, get_header
+
+ALGORITHMS = ["HS256"]
+# Tokens ya verificados que se recuerdan por contenedor
+MAX_CACHED_TOKENS = 1024
+
+# PyJWT se importa con la primera verificación (no en el import del handler)
+_jwt = None
+_secret = None
+_verified = {}
+
+
+class AuthError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _get_secret():
+    # La clave se lee una sola vez por contenedor
+    global _secret
+    if _secret is None:
+        _secret = os.environ["JWT_SECRET"]
+    return _secret
+
+
+def _decoder():
+    global _jwt
+    if _jwt is None:
+        import jwt
+        _jwt = jwt.PyJWT()
+    return _jwt
+
+
+def verify_token(token):
+    """
+    Verifica un JWT HS256 localmente y devuelve sus claims.
+    Los tokens válidos se cachean hasta su expiración, así que las
+    invocaciones siguientes con el mismo token no vuelven a verificar la firma.
+    """
+    if not token:
+        raise AuthError(401, "Token requerido")
+
+    now = time.time()
+    cached = _verified.get(token)
+    if cached is not None:
+        claims, exp = cached
+        if exp is None or exp > now:
+            return claims
+        del _verified[token]
+
+    import jwt
+    try:
+        claims = _decoder().decode(token, _get_secret(), algorithms=ALGORITHMS)
+    except jwt.ExpiredSignatureError:
+        raise AuthError(401, "Token expirado")
+    except jwt.InvalidTokenError:
+        raise AuthError(401, "Token inválido")
+
+    if not claims.get("user_id") or not claims.get("rol"):
+        raise AuthError(401, "Token inválido")
+
+    if len(_verified) >= MAX_CACHED_TOKENS:
+        # Se descarta el token más antiguo (orden de inserción)
+        _verified.pop(next(iter(_verified)))
+    _verified[token] = (claims, claims.get("exp"))
+    return claims
+
+
+def bearer_token(event):
+    value = get_header(event, "Authorization")
+    if not value:
+        return None
+    scheme, _, token = value.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return token.strip()
+    return None
+
+
+def get_claims(event, roles=None):
+    """
+    Devuelve los claims del header Authorization: Bearer <token>.
+    Si se pasan roles, el rol del token debe estar entre ellos.
+    """
+    claims = verify_token(bearer_token(event))
+    if roles is not None and claims.get("rol") not in roles:
+        raise AuthError(403, "No tiene permisos para esta operación")
+    return claims
+
+
+def requiere_auth(roles=None):
+    """
+    Decorador para lambda_handler: verifica el token y deja los claims
+    en event["claims"] antes de llamar al handler.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            try:
+                event["claims"] = get_claims(event, roles)
+            except AuthError as e:
+                return response(e.status, {"message": e.message})
+            return handler(event, context)
+        return wrapper
+    return decorator
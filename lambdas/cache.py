@@ -0,0 +1,84 @@
+import time
+import threading
+from collections import OrderedDict
+
+# Marca interna para distinguir "no existe" (búsqueda negativa) de "no cacheado"
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Caché LRU en memoria con expiración por entrada. Vive mientras el
+    contenedor de la Lambda siga caliente. Las búsquedas negativas
+    (valor None) se guardan con su propio TTL, normalmente más corto.
+    """
+
+    def __init__(self, max_size=256, ttl=300, negative_ttl=30, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=_MISSING):
+        """
+        Devuelve el valor cacheado (puede ser None si se cacheó una búsqueda
+        negativa) o `default` si no está o expiró.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        ttl = self.negative_ttl if value is None else self.ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, self._clock() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """
+        Lectura a través de la caché: si no está, llama a loader(key) y guarda
+        el resultado (también None). Las excepciones del loader no se cachean.
+        """
+        value = self.get(key)
+        if value is not _MISSING:
+            return value
+        value = loader(key)
+        self.set(key, value)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0
+            }
+
+    def __len__(self):
+        return len(self._data)
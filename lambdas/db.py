@@ -0,0 +1,165 @@
+import os
+import time
+import random
+import threading
+from lambdas import metrics
+
+# boto3/botocore se importan recién al crear el primer cliente: importar el
+# módulo (o un handler que no llega a usar AWS) no paga ese costo.
+
+# Configuración compartida por todos los clientes AWS del contenedor
+BOTO_CONFIG_OPTIONS = {
+    "max_pool_connections": int(os.environ.get("AWS_MAX_POOL_CONNECTIONS", "25")),
+    "tcp_keepalive": True,
+    "connect_timeout": float(os.environ.get("AWS_CONNECT_TIMEOUT", "2")),
+    "read_timeout": float(os.environ.get("AWS_READ_TIMEOUT", "5")),
+    "retries": {"mode": "standard", "max_attempts": 3}
+}
+
+# BatchGetItem admite hasta 100 claves por llamada
+BATCH_GET_SIZE = 100
+# Reintentos de las claves que BatchGetItem devuelve sin procesar (throttling)
+BATCH_GET_ATTEMPTS = 5
+BATCH_GET_BACKOFF_SECONDS = 0.05
+# Reintentos de transacciones canceladas por TransactionConflict
+TRANSACT_ATTEMPTS = 4
+TRANSACT_BACKOFF_SECONDS = 0.05
+
+
+class UnprocessedKeysError(Exception):
+    pass
+
+
+_lock = threading.Lock()
+_config = None
+_resource = None
+_tables = {}
+_clients = {}
+
+
+def boto_config():
+    global _config
+    if _config is None:
+        from botocore.config import Config
+        _config = Config(**BOTO_CONFIG_OPTIONS)
+    return _config
+
+
+def resource():
+    """
+    Recurso DynamoDB creado una sola vez por contenedor (lazy).
+    """
+    global _resource
+    if _resource is None:
+        with _lock:
+            if _resource is None:
+                import boto3
+                _resource = boto3.resource("dynamodb", config=boto_config())
+                metrics.instrument(_resource.meta.client)
+    return _resource
+
+
+def ddb_client():
+    # Cliente del recurso: acepta tipos Python (transact_write_items, batch_get_item...)
+    return resource().meta.client
+
+
+def table(name):
+    tbl = _tables.get(name)
+    if tbl is None:
+        tbl = resource().Table(name)
+        _tables[name] = tbl
+    return tbl
+
+
+def incidents_table():
+    return table(os.environ.get("INCIDENTS_TABLE", "Incidents"))
+
+
+def users_table():
+    return table(os.environ["USERS_TABLE"])
+
+
+def sockets_table():
+    return table(os.environ["SOCKET_TABLE"])
+
+
+def history_table():
+    return table(os.environ["INCIDENT_HISTORY_TABLE"])
+
+
+def search_table():
+    return table(os.environ["INCIDENT_SEARCH_TABLE"])
+
+
+def meta_table():
+    return table(os.environ["INCIDENTS_META_TABLE"])
+
+
+def batch_get_incidents(incident_ids, consistent=True):
+    """
+    Lee los incidentes con BatchGetItem, reintentando con backoff las claves
+    no procesadas. Devuelve {incident_id: item}; si tras BATCH_GET_ATTEMPTS
+    quedan claves sin leer lanza UnprocessedKeysError (no se reportan como
+    inexistentes).
+    """
+    client = ddb_client()
+    table_name = incidents_table().name
+    found = {}
+    for start in range(0, len(incident_ids), BATCH_GET_SIZE):
+        request = {table_name: {
+            "Keys": [{"incident_id": i} for i in incident_ids[start:start + BATCH_GET_SIZE]],
+            "ConsistentRead": consistent
+        }}
+        for attempt in range(BATCH_GET_ATTEMPTS):
+            if attempt:
+                time.sleep(BATCH_GET_BACKOFF_SECONDS * (2 ** (attempt - 1)) * (1 + random.random()))
+            resp = client.batch_get_item(RequestItems=request)
+            for item in resp.get("Responses", {}).get(table_name, []):
+                found[item["incident_id"]] = item
+            request = resp.get("UnprocessedKeys") or None
+            if not request:
+                break
+        else:
+            pending = len(request[table_name]["Keys"])
+            raise UnprocessedKeysError(f"{pending} claves sin procesar tras {BATCH_GET_ATTEMPTS} intentos")
+    return found
+
+
+def transact_write(transact_items):
+    """
+    transact_write_items reintentando (con backoff) las cancelaciones por
+    TransactionConflict: otra escritura tocaba los mismos items en ese
+    momento. Las demás cancelaciones (ej. ConditionalCheckFailed) se
+    propagan enseguida.
+    """
+    c = ddb_client()
+    for attempt in range(TRANSACT_ATTEMPTS):
+        try:
+            return c.transact_write_items(TransactItems=transact_items)
+        except c.exceptions.TransactionCanceledException as e:
+            reasons = e.response.get("CancellationReasons") or []
+            codes = {r.get("Code") for r in reasons} - {"None", None}
+            if codes != {"TransactionConflict"} or attempt == TRANSACT_ATTEMPTS - 1:
+                raise
+            time.sleep(TRANSACT_BACKOFF_SECONDS * (2 ** attempt) * (1 + random.random()))
+
+
+def client(service, endpoint_url=None, config=None):
+    """
+    Cliente boto3 cacheado por servicio y endpoint. `config` (dict de
+    opciones de botocore Config) se combina con BOTO_CONFIG_OPTIONS
+    (ej. timeouts propios de un servicio).
+    """
+    key = (service, endpoint_url)
+    c = _clients.get(key)
+    if c is None:
+        with _lock:
+            c = _clients.get(key)
+            if c is None:
+                import boto3
+                from botocore.config import Config
+                merged = Config(**{**BOTO_CONFIG_OPTIONS, **(config or {})})
+                c = metrics.instrument(boto3.client(service, endpoint_url=endpoint_url, config=merged))
+                _clients[key] = c
+    return c
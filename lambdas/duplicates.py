@@ -0,0 +1,102 @@
+import os
+import re
+import time
+from lambdas import db
+from lambdas.search import normalize
+
+# Reportes repetidos: un marcador por (tipo, piso, ambiente) en la tabla meta
+# apunta al incidente abierto más reciente de ese lugar. Mientras no venza,
+# los reportes iguales se suman a ese incidente en lugar de crear otro.
+# 0 desactiva la agrupación.
+DUPLICATE_WINDOW_SECONDS = int(os.environ.get("DUPLICATE_WINDOW_SECONDS", "1800"))
+OPEN_STATUSES = ("pending", "in_progress")
+
+# Avisos a administradores por reportes adicionales: al segundo reporte y
+# luego cada NOTIFY_EVERY, no uno por cada estudiante
+NOTIFY_EVERY = int(os.environ.get("DUPLICATE_NOTIFY_EVERY", "5"))
+
+_SPACES = re.compile(r"[\s\-_]+")
+
+
+def enabled():
+    return DUPLICATE_WINDOW_SECONDS > 0
+
+
+def marker_key(incident_type, floor, ambient):
+    # "A-101", "a 101" y "A101 " cuentan como el mismo ambiente
+    place = _SPACES.sub("", normalize(ambient or ""))
+    try:
+        floor = int(floor)
+    except (TypeError, ValueError):
+        pass
+    return {"pk": f"dup#{incident_type}#{floor}#{place}"}
+
+
+def find(key, now=None):
+    """
+    Incidente abierto al que apunta el marcador, o None si no hay marcador
+    vigente, el incidente ya se cerró o una edición lo movió de lugar (el
+    marcador queda obsoleto). Dos lecturas por clave, sin scan.
+    """
+    now = int(now or time.time())
+    marker = db.meta_table().get_item(Key=key, ConsistentRead=True).get("Item")
+    if not marker or int(marker.get("expires_at", 0)) < now:
+        return marker, None
+    incident = db.incidents_table().get_item(
+        Key={"incident_id": marker["incident_id"]},
+        ConsistentRead=True
+    ).get("Item")
+    if not incident or incident.get("status") not in OPEN_STATUSES:
+        return marker, None
+    if incident_key(incident) != key:
+        return marker, None
+    return marker, incident
+
+
+def incident_key(incident):
+    return marker_key(incident.get("type"), incident.get("floor"), incident.get("ambient"))
+
+
+def release(incident):
+    """
+    Borra el marcador del lugar del incidente si todavía apunta a él. Se usa
+    cuando una edición cambia tipo, piso o ambiente.
+    """
+    try:
+        db.meta_table().delete_item(
+            Key=incident_key(incident),
+            ConditionExpression="incident_id = :id",
+            ExpressionAttributeValues={":id": incident["incident_id"]}
+        )
+    except db.ddb_client().exceptions.ConditionalCheckFailedException:
+        pass
+
+
+def claim_op(key, incident_id, now, stale_incident_id=None):
+    """
+    Put del marcador para la transacción de creación. Falla si otro reporte
+    ya dejó un marcador vigente (lo vemos como cancelación y se agrupa).
+    `stale_incident_id` permite reemplazar un marcador de un incidente cerrado.
+    """
+    condition = "attribute_not_exists(pk) OR expires_at < :now"
+    values = {":now": int(now)}
+    if stale_incident_id:
+        condition += " OR incident_id = :stale"
+        values[":stale"] = stale_incident_id
+    return {"Put": {
+        "TableName": os.environ["INCIDENTS_META_TABLE"],
+        "Item": {**key, "incident_id": incident_id, "expires_at": int(now) + DUPLICATE_WINDOW_SECONDS},
+        "ConditionExpression": condition,
+        "ExpressionAttributeValues": values
+    }}
+
+
+def already_reported(incident, user_id):
+    if not user_id or user_id == "unknown":
+        return False
+    return incident.get("created_by") == user_id or user_id in (incident.get("reporters") or set())
+
+
+def should_notify(report_count):
+    report_count = int(report_count)
+    return report_count == 2 or (NOTIFY_EVERY > 0 and report_count % NOTIFY_EVERY == 0)
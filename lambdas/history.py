@@ -0,0 +1,91 @@
+import os
+import uuid
+import hashlib
+import argparse
+from lambdas import db
+
+# El historial de cada incidente vive en su propia tabla:
+# incident_id (HASH) + sk = "<timestamp ISO>#<sufijo>" (RANGE), ordenado por fecha.
+
+
+def entry(incident_id, action, by, at, **extra):
+    item = {
+        "incident_id": incident_id,
+        # El sufijo evita colisiones entre entradas con el mismo timestamp
+        "sk": f"{at}#{uuid.uuid4().hex[:8]}",
+        "action": action,
+        "by": by,
+        "at": at
+    }
+    item.update(extra)
+    return item
+
+
+def put_op(item):
+    # Operación Put para incluir la entrada en un transact_write_items
+    return {"Put": {
+        "TableName": os.environ["INCIDENT_HISTORY_TABLE"],
+        "Item": item,
+        "ConditionExpression": "attribute_not_exists(sk)"
+    }}
+
+
+def _legacy_entries(incident):
+    # Entradas de la lista "history" embebida en los incidentes anteriores.
+    # El sufijo sale de (incident_id, posición): repetir la migración no duplica
+    for position, legacy in enumerate(incident.get("history") or []):
+        at = legacy.get("at") or incident.get("created_at") or ""
+        suffix = hashlib.md5(f"{incident['incident_id']}:{position}".encode()).hexdigest()[:8]
+        extra = {k: v for k, v in legacy.items() if k not in ("action", "by", "at")}
+        item = entry(incident["incident_id"], legacy.get("action"), legacy.get("by"), at, **extra)
+        item["sk"] = f"{at}#{suffix}"
+        yield item
+
+
+def migrate():
+    """
+    Copia a la tabla de historial las listas "history" de los incidentes
+    anteriores y luego las quita del item (scan completo). Se puede repetir.
+    """
+    table = db.incidents_table()
+    client = db.ddb_client()
+    scan_kwargs = {
+        "TableName": table.name,
+        "ProjectionExpression": "incident_id, created_at, #h",
+        "FilterExpression": "attribute_exists(#h)",
+        "ExpressionAttributeNames": {"#h": "history"}
+    }
+    migrated = 0
+    while True:
+        resp = client.scan(**scan_kwargs)
+        for incident in resp.get("Items", []):
+            with db.history_table().batch_writer() as batch:
+                for item in _legacy_entries(incident):
+                    batch.put_item(Item=item)
+            # Solo se quita la lista ya copiada (nadie le agrega entradas)
+            try:
+                table.update_item(
+                    Key={"incident_id": incident["incident_id"]},
+                    UpdateExpression="REMOVE #h",
+                    ConditionExpression="size(#h) = :n",
+                    ExpressionAttributeNames={"#h": "history"},
+                    ExpressionAttributeValues={":n": len(incident["history"])}
+                )
+                migrated += 1
+            except client.exceptions.ConditionalCheckFailedException:
+                print(f"Historial de {incident['incident_id']} cambió durante la migración: volver a correrla")
+        if "LastEvaluatedKey" not in resp:
+            break
+        scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+    print(f"✓ Historial de {migrated} incidentes migrado")
+    return migrated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Historial de incidentes")
+    parser.add_argument("--migrate", action="store_true",
+                        help="mover las listas history de los incidentes a la tabla de historial")
+    args = parser.parse_args()
+
+    if args.migrate:
+        migrate()
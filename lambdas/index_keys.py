@@ -0,0 +1,126 @@
+import os
+import hashlib
+import argparse
+from lambdas import db, versions
+
+# Atributos derivados que sirven de clave en los GSI de la tabla de incidentes.
+# Todos los handlers que escriben incidentes los calculan desde aquí.
+
+# Shards por valor de urgencia / piso / estado. Solo se debe aumentar: los items ya
+# escritos quedan en shards menores y las lecturas consultan todos.
+INDEX_SHARDS = int(os.environ.get("INDEX_SHARDS", "4"))
+
+# Atributos solo para los índices: no se devuelven al cliente
+INTERNAL_FIELDS = {"urgency_shard", "floor_shard", "status_shard", "updated_bucket", "status_batch"}
+
+
+def public(item):
+    return {k: v for k, v in item.items() if k not in INTERNAL_FIELDS}
+
+
+def updated_bucket(updated_at):
+    # Partición por día (UTC) del GSI de cambios: "YYYY-MM-DD"
+    return updated_at[:10]
+
+
+def shard_for(incident_id):
+    # Determinístico por incident_id: una edición no mueve el item de shard
+    return int(hashlib.md5(incident_id.encode()).hexdigest(), 16) % INDEX_SHARDS
+
+
+def urgency_shard(urgency, incident_id):
+    return f"{urgency}#{shard_for(incident_id)}"
+
+
+def floor_shard(floor, incident_id):
+    return f"{int(floor)}#{shard_for(incident_id)}"
+
+
+def status_shard(status, incident_id):
+    return f"{status}#{shard_for(incident_id)}"
+
+
+def urgency_shards(urgency):
+    return [f"{urgency}#{i}" for i in range(INDEX_SHARDS)]
+
+
+def floor_shards(floor):
+    return [f"{int(floor)}#{i}" for i in range(INDEX_SHARDS)]
+
+
+def status_shards(status):
+    return [f"{status}#{i}" for i in range(INDEX_SHARDS)]
+
+
+def derived(incident):
+    """
+    Atributos de índice que le corresponden a un incidente según sus datos.
+    """
+    keys = {
+        "urgency_shard": urgency_shard(incident["urgency"], incident["incident_id"]),
+        "floor_shard": floor_shard(incident["floor"], incident["incident_id"]),
+        "status_shard": status_shard(incident["status"], incident["incident_id"])
+    }
+    if incident.get("updated_at"):
+        keys["updated_bucket"] = updated_bucket(incident["updated_at"])
+    return keys
+
+
+def backfill():
+    """
+    Completa los atributos de índice de los incidentes anteriores a los GSIs
+    con shards (scan completo). Se puede repetir: solo escribe los que faltan
+    o no coinciden.
+    """
+    table = db.incidents_table()
+    client = db.ddb_client()
+    scan_kwargs = {
+        "TableName": table.name,
+        "ProjectionExpression": "incident_id, floor, urgency, #s, updated_at, urgency_shard, floor_shard, status_shard, updated_bucket",
+        "ExpressionAttributeNames": {"#s": "status"}
+    }
+    updated = 0
+    scopes = set()
+    while True:
+        resp = client.scan(**scan_kwargs)
+        for incident in resp.get("Items", []):
+            try:
+                keys = derived(incident)
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Incidente {incident['incident_id']} sin piso/urgencia/estado válidos: {str(e)}")
+                continue
+            if all(incident.get(k) == v for k, v in keys.items()):
+                continue
+            names = {f"#k{i}": k for i, k in enumerate(keys)}
+            values = {f":k{i}": v for i, v in enumerate(keys.values())}
+            try:
+                # Si una edición o un cambio de estado se adelantó entre el
+                # scan y el update, esa escritura ya dejó sus propios shards
+                table.update_item(
+                    Key={"incident_id": incident["incident_id"]},
+                    UpdateExpression="SET " + ", ".join(f"#k{i} = :k{i}" for i in range(len(keys))),
+                    ConditionExpression="floor = :floor AND urgency = :urgency AND #s = :status",
+                    ExpressionAttributeNames={**names, "#s": "status"},
+                    ExpressionAttributeValues={**values, ":floor": incident["floor"], ":urgency": incident["urgency"],
+                                               ":status": incident["status"]}
+                )
+                updated += 1
+                scopes.update(versions.scopes_for(incident))
+            except client.exceptions.ConditionalCheckFailedException:
+                pass
+        if "LastEvaluatedKey" not in resp:
+            break
+        scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+    # Las listas por piso/urgencia cambian: las entradas cacheadas dejan de valer
+    versions.bump(sorted(scopes))
+    print(f"✓ {updated} incidentes con atributos de índice completados")
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Atributos de índice de la tabla de incidentes")
+    parser.add_argument("--backfill", action="store_true", help="completar los atributos de los incidentes existentes")
+    args = parser.parse_args()
+
+    if args.backfill:
+        backfill()
@@ -0,0 +1,202 @@
+import os
+import sys
+import json
+import time
+import random
+import functools
+import threading
+
+# Métricas de los handlers y de cada llamada a DynamoDB / API Gateway en
+# CloudWatch Embedded Metric Format: líneas JSON en el log que CloudWatch
+# convierte en métricas sin llamadas extra. Solo se mide una fracción de
+# las invocaciones (METRICS_SAMPLE_RATE); el resto no paga casi nada.
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "Incidentes")
+METRICS_SAMPLE_RATE = float(os.environ.get("METRICS_SAMPLE_RATE", "0.1"))
+INSTRUMENTED_SERVICES = {"dynamodb", "apigatewaymanagementapi"}
+# EMF admite hasta 100 valores por métrica en una línea
+MAX_VALUES = 100
+
+_lock = threading.Lock()
+# Invocación medida en curso (Lambda procesa una por contenedor a la vez)
+_current = None
+_cold_start = True
+
+
+class _Invocation:
+    def __init__(self, handler):
+        self.handler = handler
+        # operación -> {métrica: [valores]}
+        self.calls = {}
+
+    def add(self, operation, values):
+        with _lock:
+            metrics = self.calls.setdefault(operation, {})
+            for name, value in values.items():
+                if value is not None:
+                    metrics.setdefault(name, []).append(value)
+
+
+def _emf(dimensions, properties, metrics, units):
+    document = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": METRICS_NAMESPACE,
+                "Dimensions": [list(dimensions)],
+                "Metrics": [{"Name": name, "Unit": units.get(name, "None")} for name in metrics]
+            }]
+        }
+    }
+    document.update(dimensions)
+    document.update(properties)
+    document.update(metrics)
+    sys.stdout.write(json.dumps(document, default=str) + "\n")
+
+
+CALL_UNITS = {
+    "CallDuration": "Milliseconds",
+    "ConsumedCapacity": "Count",
+    "ItemCount": "Count",
+    "RequestBytes": "Bytes",
+    "ResponseBytes": "Bytes"
+}
+HANDLER_UNITS = {"Duration": "Milliseconds", "AwsCalls": "Count", "Errors": "Count"}
+
+
+# --- Hooks de botocore ------------------------------------------------------
+
+def _add_consumed_capacity(params, model, **kwargs):
+    # Sin este parámetro DynamoDB no devuelve la capacidad consumida
+    if _current is not None and "ReturnConsumedCapacity" in model.input_shape.members:
+        params.setdefault("ReturnConsumedCapacity", "TOTAL")
+
+
+def _before_call(params, context, **kwargs):
+    if _current is None:
+        return
+    context["metrics_started"] = time.perf_counter()
+    body = params.get("body")
+    context["metrics_request_bytes"] = len(body) if body else 0
+
+
+def _capacity(parsed):
+    consumed = parsed.get("ConsumedCapacity")
+    if consumed is None:
+        return None
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    return sum(float(c.get("CapacityUnits", 0)) for c in consumed)
+
+
+def _item_count(parsed):
+    if "Count" in parsed:
+        return parsed["Count"]
+    if "Item" in parsed:
+        return 1
+    if "Responses" in parsed:
+        responses = parsed["Responses"]
+        if isinstance(responses, dict):
+            return sum(len(items) for items in responses.values())
+        return len(responses)
+    return None
+
+
+def _after_call(http_response, parsed, model, context, **kwargs):
+    invocation = _current
+    started = context.get("metrics_started")
+    if invocation is None or started is None:
+        return
+    content = getattr(http_response, "content", None)
+    invocation.add(f"{model.service_model.service_name}.{model.name}", {
+        "CallDuration": round((time.perf_counter() - started) * 1000, 3),
+        "ConsumedCapacity": _capacity(parsed),
+        "ItemCount": _item_count(parsed),
+        "RequestBytes": context.get("metrics_request_bytes"),
+        "ResponseBytes": len(content) if content is not None else None
+    })
+
+
+def instrument(client):
+    """
+    Registra los hooks de medición en un cliente boto3 (solo DynamoDB y
+    API Gateway Management; otros servicios se dejan igual).
+    """
+    service = client.meta.service_model.service_name
+    if service not in INSTRUMENTED_SERVICES:
+        return client
+    events = client.meta.events
+    if service == "dynamodb":
+        events.register("provide-client-params.dynamodb", _add_consumed_capacity)
+    events.register("before-call", _before_call)
+    events.register("after-call", _after_call)
+    return client
+
+
+def emit(name, value=1, unit="Count", dimensions=None):
+    """
+    Métrica puntual, fuera del muestreo: para eventos raros (fallos) que no
+    deben perderse en las invocaciones no medidas.
+    """
+    try:
+        _emf(dimensions or {}, {}, {name: value}, {name: unit})
+    except Exception as e:
+        print(f"Error emitiendo métricas: {str(e)}")
+
+
+# --- Handlers ----------------------------------------------------------------
+
+def _status(result):
+    if isinstance(result, dict):
+        return result.get("statusCode")
+    return None
+
+
+def _flush(invocation, duration_ms, status, error):
+    global _cold_start
+    dimensions = {"Handler": invocation.handler}
+    _emf(dimensions, {"StatusCode": status, "ColdStart": _cold_start}, {
+        "Duration": round(duration_ms, 3),
+        "AwsCalls": sum(len(m.get("CallDuration", [])) for m in invocation.calls.values()),
+        # Los handlers capturan sus excepciones y devuelven 500: también cuentan
+        "Errors": 1 if error or (isinstance(status, int) and status >= 500) else 0
+    }, HANDLER_UNITS)
+    for operation, metrics in invocation.calls.items():
+        _emf({**dimensions, "Operation": operation}, {},
+             {name: values[:MAX_VALUES] for name, values in metrics.items()}, CALL_UNITS)
+    _cold_start = False
+
+
+def instrumentar(func):
+    """
+    Decorador de handler: con probabilidad METRICS_SAMPLE_RATE mide la
+    invocación completa y las llamadas AWS que hace, y las emite en EMF.
+    """
+    handler_name = func.__module__.rsplit(".", 1)[-1]
+
+    @functools.wraps(func)
+    def wrapper(event, context):
+        global _current, _cold_start
+        if METRICS_SAMPLE_RATE <= 0 or random.random() >= METRICS_SAMPLE_RATE:
+            _cold_start = False
+            return func(event, context)
+
+        invocation = _Invocation(handler_name)
+        _current = invocation
+        started = time.perf_counter()
+        result = None
+        error = None
+        try:
+            result = func(event, context)
+            return result
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            _current = None
+            try:
+                _flush(invocation, (time.perf_counter() - started) * 1000, _status(result), error)
+            except Exception as e:
+                # La medición nunca debe romper el handler
+                print(f"Error emitiendo métricas: {str(e)}")
+
+    return wrapper
@@ -0,0 +1,128 @@
+import os
+import json
+from lambdas.cache import TTLCache
+from lambdas.utils import dumps
+
+try:
+    # Backend externo opcional (compartido entre contenedores)
+    import redis
+except ImportError:
+    redis = None
+
+# Caché read-through de las consultas de listas. La clave incluye el ETag,
+# que ya combina alcance + versión + parámetros: cuando un handler de
+# escritura sube la versión, las entradas viejas dejan de ser alcanzables
+# y salen solas por LRU/TTL. Mientras la versión es más reciente que
+# VERSION_SETTLE_SECONDS el validador es None y no se cachea: los GSI aún
+# pueden no reflejar la escritura y el resultado quedaría fijado viejo.
+QUERY_CACHE_BACKEND = os.environ.get("QUERY_CACHE_BACKEND", "memory")
+QUERY_CACHE_SIZE = int(os.environ.get("QUERY_CACHE_SIZE", "128"))
+QUERY_CACHE_TTL = int(os.environ.get("QUERY_CACHE_TTL", "300"))
+# Resultados más grandes no se cachean (acota la memoria por entrada)
+QUERY_CACHE_MAX_ITEMS = int(os.environ.get("QUERY_CACHE_MAX_ITEMS", "500"))
+
+
+class MemoryStore:
+    """
+    En el proceso: por contenedor, acotado en número de entradas.
+    """
+
+    def __init__(self, max_size=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL):
+        self._cache = TTLCache(max_size=max_size, ttl=ttl, negative_ttl=0)
+
+    def get(self, key):
+        return self._cache.get(key, None)
+
+    def set(self, key, value):
+        self._cache.set(key, value)
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class ExternalStore:
+    """
+    Store externo con la interfaz de redis-py (get / set con ex=). En local
+    se puede pasar cualquier objeto con esos dos métodos.
+    """
+
+    def __init__(self, client, ttl=QUERY_CACHE_TTL, prefix="qc:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, dumps(value), ex=self.ttl)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def store_from_env():
+    if QUERY_CACHE_BACKEND == "none":
+        return None
+    if QUERY_CACHE_BACKEND == "redis":
+        if redis is None:
+            print("QUERY_CACHE_BACKEND=redis pero redis no está instalado; se usa memoria")
+            return MemoryStore()
+        return ExternalStore(redis.Redis.from_url(os.environ["QUERY_CACHE_URL"]))
+    return MemoryStore()
+
+
+_store = None
+
+
+def store():
+    global _store
+    if _store is None:
+        _store = store_from_env()
+    return _store
+
+
+def set_store(new_store):
+    # Para reemplazar el backend (ej. un fake en pruebas locales)
+    global _store
+    _store = new_store
+
+
+def _size(value):
+    if isinstance(value, dict):
+        return len(value.get("data") or [])
+    return len(value)
+
+
+def cached(endpoint, tag, loader):
+    """
+    Devuelve el resultado cacheado para (endpoint, tag) o lo calcula con
+    loader() y lo guarda. Un fallo del store nunca rompe la consulta.
+    """
+    s = store()
+    # Sin tag (versión recién cambiada) no se cachea: ver versions.validator
+    if s is None or tag is None:
+        return loader()
+
+    key = f"{endpoint}:{tag}"
+    try:
+        value = s.get(key)
+        if value is not None:
+            return value
+    except Exception as e:
+        print(f"Error leyendo caché {key}: {str(e)}")
+
+    value = loader()
+    if _size(value) <= QUERY_CACHE_MAX_ITEMS:
+        try:
+            s.set(key, value)
+        except Exception as e:
+            print(f"Error guardando caché {key}: {str(e)}")
+    return value
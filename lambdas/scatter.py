@@ -0,0 +1,56 @@
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor
+from lambdas import db
+
+SCATTER_MAX_WORKERS = int(os.environ.get("SCATTER_MAX_WORKERS", "8"))
+
+# Pool compartido por el contenedor para las consultas a los shards. Se crea
+# con la primera consulta: los handlers que no la usan no lo pagan.
+_executor = None
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=SCATTER_MAX_WORKERS)
+    return _executor
+
+
+def _query_shard(table_name, index_name, attribute, value, newest_first):
+    # Se usa el cliente (thread-safe) y no el recurso Table
+    from boto3.dynamodb.conditions import Key
+    client = db.ddb_client()
+    query_kwargs = {
+        "TableName": table_name,
+        "IndexName": index_name,
+        "KeyConditionExpression": Key(attribute).eq(value),
+        "ScanIndexForward": not newest_first
+    }
+    items = []
+    while True:
+        resp = client.query(**query_kwargs)
+        items.extend(resp.get("Items", []))
+        if "LastEvaluatedKey" not in resp:
+            return items
+        query_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+def query_shards(index_name, attribute, shard_values, newest_first=True):
+    """
+    Consulta en paralelo cada shard del índice (sort key created_at) y mezcla
+    los resultados ya ordenados por created_at.
+    """
+    table_name = db.incidents_table().name
+    futures = [
+        _pool().submit(_query_shard, table_name, index_name, attribute, value, newest_first)
+        for value in shard_values
+    ]
+    results = [f.result() for f in futures]
+    return list(heapq.merge(*results, key=lambda item: item.get("created_at", ""), reverse=newest_first))
+
+
+def run_parallel(fn, values):
+    # Aplica fn a cada valor en el pool compartido, conservando el orden
+    futures = [_pool().submit(fn, value) for value in values]
+    return [f.result() for f in futures]
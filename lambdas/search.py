@@ -0,0 +1,155 @@
+import re
+import argparse
+import unicodedata
+from lambdas import db
+
+# Índice invertido de incidentes en su propia tabla:
+#   pk = "k#<primeros 2 caracteres del token>", sk = "<token>#<incident_id>"
+# Una búsqueda por prefijo es un Query con begins_with(sk, prefijo) sobre una
+# sola partición: el costo depende de las coincidencias, no del tamaño de la tabla.
+SEARCH_FIELDS = ["description", "ambient"]
+PARTITION_CHARS = 2
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 40
+
+STOPWORDS = {
+    "al", "con", "de", "del", "el", "en", "es", "esta", "este", "hay", "la", "las",
+    "le", "lo", "los", "mas", "muy", "no", "para", "pero", "por", "que", "se", "sin",
+    "su", "sus", "un", "una", "uno", "y", "ya"
+}
+
+# Palabras de letras/dígitos, con guiones internos ("a-302", "wi-fi")
+_WORD = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+
+def normalize(text):
+    # Minúsculas y sin tildes ni diéresis: "Proyección" -> "proyeccion"
+    decomposed = unicodedata.normalize("NFKD", str(text).lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """
+    Tokens normalizados de un texto. Las palabras con guion se indexan
+    enteras y también por partes ("a-302" -> "a-302", "302").
+    """
+    tokens = set()
+    for word in _WORD.findall(normalize(text or "")):
+        candidates = [word] + (word.split("-") if "-" in word else [])
+        for token in candidates:
+            if MIN_TOKEN_LENGTH <= len(token) <= MAX_TOKEN_LENGTH and token not in STOPWORDS:
+                tokens.add(token)
+    return tokens
+
+
+def tokens_for(incident):
+    tokens = set()
+    for field in SEARCH_FIELDS:
+        tokens |= tokenize(incident.get(field))
+    return tokens
+
+
+def _key(token, incident_id):
+    return {"pk": f"k#{token[:PARTITION_CHARS]}", "sk": f"{token}#{incident_id}"}
+
+
+def posting(token, incident_id, created_at):
+    return {**_key(token, incident_id), "incident_id": incident_id, "created_at": created_at}
+
+
+def update_postings(incident_id, old_tokens, new_tokens, created_at):
+    """
+    Aplica la diferencia de postings de un incidente (BatchWriteItem de 25 en 25).
+    Se llama después de escribir el incidente; un error se registra y no se propaga.
+    """
+    removed = set(old_tokens) - set(new_tokens)
+    added = set(new_tokens) - set(old_tokens)
+    if not removed and not added:
+        return
+    try:
+        with db.search_table().batch_writer() as batch:
+            for token in removed:
+                batch.delete_item(Key=_key(token, incident_id))
+            for token in added:
+                batch.put_item(Item=posting(token, incident_id, created_at))
+    except Exception as e:
+        print(f"Error actualizando índice de búsqueda de {incident_id}: {str(e)}")
+
+
+def index_incident(incident, old_incident=None):
+    old_tokens = tokens_for(old_incident) if old_incident else set()
+    update_postings(incident["incident_id"], old_tokens, tokens_for(incident), incident.get("created_at", ""))
+
+
+def query_terms(text):
+    """
+    Términos de búsqueda: cada palabra de la consulta se busca como prefijo.
+    Los términos de un carácter no se indexan y se descartan.
+    """
+    terms = set()
+    for word in _WORD.findall(normalize(text or "")):
+        if len(word) >= MIN_TOKEN_LENGTH and word not in STOPWORDS:
+            terms.add(word[:MAX_TOKEN_LENGTH])
+    return sorted(terms)
+
+
+def matches_all(incident, terms):
+    # Verificación final contra el texto actual (descarta postings desactualizados)
+    tokens = tokens_for(incident)
+    return all(any(token.startswith(term) for token in tokens) for term in terms)
+
+
+def prefix_matches(term):
+    """
+    {incident_id: created_at} de los incidentes con algún token que empieza por `term`.
+    """
+    client = db.ddb_client()
+    query_kwargs = {
+        "TableName": db.search_table().name,
+        "KeyConditionExpression": "pk = :pk AND begins_with(sk, :prefix)",
+        "ExpressionAttributeValues": {":pk": f"k#{term[:PARTITION_CHARS]}", ":prefix": term},
+        "ProjectionExpression": "incident_id, created_at"
+    }
+    matches = {}
+    while True:
+        resp = client.query(**query_kwargs)
+        for item in resp.get("Items", []):
+            matches[item["incident_id"]] = item.get("created_at", "")
+        if "LastEvaluatedKey" not in resp:
+            return matches
+        query_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+def backfill():
+    """
+    Indexa los incidentes ya existentes (scan completo, una sola vez).
+    """
+    client = db.ddb_client()
+    scan_kwargs = {
+        "TableName": db.incidents_table().name,
+        "ProjectionExpression": "incident_id, created_at, #d, ambient",
+        "ExpressionAttributeNames": {"#d": "description"}
+    }
+    indexed = 0
+    while True:
+        resp = client.scan(**scan_kwargs)
+        for incident in resp.get("Items", []):
+            index_incident(incident)
+            indexed += 1
+        if "LastEvaluatedKey" not in resp:
+            break
+        scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+    print(f"✓ {indexed} incidentes indexados")
+    return indexed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Índice de búsqueda de incidentes")
+    parser.add_argument("--backfill", action="store_true", help="indexar los incidentes existentes")
+    parser.add_argument("--tokens", help="mostrar los tokens de un texto")
+    args = parser.parse_args()
+
+    if args.tokens is not None:
+        print(sorted(tokenize(args.tokens)))
+    if args.backfill:
+        backfill()
@@ -0,0 +1,110 @@
+import argparse
+from lambdas import db
+
+# Contadores agregados de incidentes en un único item de la tabla meta.
+# Cada escritura de incidente suma su delta cuando se confirma (apply).
+STATS_KEY = {"pk": "stats"}
+
+
+def _counters(incident):
+    counters = ["total", f"status_{incident.get('status')}"]
+    if incident.get("floor") is not None:
+        counters.append(f"floor_{int(incident['floor'])}")
+    if incident.get("urgency"):
+        counters.append(f"urgency_{incident['urgency']}")
+    return counters
+
+
+def diff(old_incident, new_incident):
+    """
+    Deltas de contadores entre dos versiones de un incidente
+    (old_incident=None para uno nuevo). Omite los que no cambian.
+    La escritura debe condicionarse a que old_incident siga vigente (p. ej.
+    `#s = :old_status`): si cambió desde la lectura, los deltas quedan mal.
+    """
+    deltas = {}
+    if old_incident is not None:
+        for counter in _counters(old_incident):
+            deltas[counter] = deltas.get(counter, 0) - 1
+    if new_incident is not None:
+        for counter in _counters(new_incident):
+            deltas[counter] = deltas.get(counter, 0) + 1
+    return {k: v for k, v in deltas.items() if v != 0}
+
+
+def apply(deltas):
+    """
+    Suma los deltas al item de contadores con un update_item ADD, después de
+    que la escritura del incidente se confirmó. Fuera de la transacción: un
+    solo item que tocan todas las escrituras cancelaría las transacciones
+    concurrentes con TransactionConflict. Un ADD suelto no compite.
+    """
+    deltas = {k: v for k, v in deltas.items() if v != 0}
+    if not deltas:
+        return
+    names = {}
+    values = {}
+    parts = []
+    for i, (counter, delta) in enumerate(sorted(deltas.items())):
+        names[f"#c{i}"] = counter
+        values[f":d{i}"] = delta
+        parts.append(f"#c{i} :d{i}")
+    try:
+        db.meta_table().update_item(
+            Key=STATS_KEY,
+            UpdateExpression="ADD " + ", ".join(parts),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+    except Exception as e:
+        # El incidente ya se escribió; los contadores se corrigen con --recount
+        print(f"❌ Error actualizando contadores {deltas}: {str(e)}")
+
+
+def recount():
+    """
+    Recalcula los contadores desde la tabla de incidentes (scan completo).
+    """
+    counters = {}
+    scan_kwargs = {
+        "TableName": db.incidents_table().name,
+        "ProjectionExpression": "#s, floor, urgency",
+        "ExpressionAttributeNames": {"#s": "status"}
+    }
+    while True:
+        resp = db.ddb_client().scan(**scan_kwargs)
+        for incident in resp.get("Items", []):
+            for counter in _counters(incident):
+                counters[counter] = counters.get(counter, 0) + 1
+        if "LastEvaluatedKey" not in resp:
+            break
+        scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+    db.meta_table().put_item(Item={**STATS_KEY, **counters})
+    print(f"✓ Contadores recalculados: {counters.get('total', 0)} incidentes")
+    return counters
+
+
+def summarize(item):
+    """
+    Convierte el item de contadores en la respuesta de /incidents/stats.
+    """
+    result = {"total": 0, "by_status": {}, "by_floor": {}, "by_urgency": {}}
+    for name, value in (item or {}).items():
+        if name == "total":
+            result["total"] = int(value)
+        elif name.startswith("status_"):
+            result["by_status"][name[len("status_"):]] = int(value)
+        elif name.startswith("floor_"):
+            result["by_floor"][name[len("floor_"):]] = int(value)
+        elif name.startswith("urgency_"):
+            result["by_urgency"][name[len("urgency_"):]] = int(value)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Contadores de incidentes")
+    parser.add_argument("--recount", action="store_true", help="recalcular desde la tabla de incidentes")
+    args = parser.parse_args()
+
+    if args.recount:
+        recount()
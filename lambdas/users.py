@@ -0,0 +1,110 @@
+import os
+import argparse
+from lambdas import db
+from lambdas.cache import TTLCache
+
+# Solo los atributos de perfil: nunca se cachea el hash de la contraseña
+PROFILE_FIELDS = ["user_id", "nombre", "nombres", "apellidos", "correo", "rol"]
+
+_profiles = TTLCache(
+    max_size=int(os.environ.get("USER_CACHE_SIZE", "512")),
+    ttl=float(os.environ.get("USER_CACHE_TTL", "300")),
+    negative_ttl=float(os.environ.get("USER_CACHE_NEGATIVE_TTL", "30"))
+)
+
+
+def _load(user_id):
+    resp = db.users_table().get_item(
+        Key={"user_id": user_id},
+        ProjectionExpression=", ".join(f"#p{i}" for i in range(len(PROFILE_FIELDS))),
+        ExpressionAttributeNames={f"#p{i}": f for i, f in enumerate(PROFILE_FIELDS)}
+    )
+    return resp.get("Item")
+
+
+def get_user(user_id):
+    """
+    Perfil del usuario (o None si no existe), cacheado por contenedor.
+    """
+    if not user_id:
+        return None
+    return _profiles.get_or_load(user_id, _load)
+
+
+def display_name(user, default="Usuario"):
+    nombre = user.get("nombre", user.get("nombres", ""))
+    apellidos = user.get("apellidos", "")
+    return f"{nombre} {apellidos}".strip() or user.get("correo", default)
+
+
+def invalidate(user_id):
+    _profiles.invalidate(user_id)
+
+
+def cache_stats():
+    return _profiles.stats()
+
+
+# Items marcador en la tabla de usuarios que reservan un correo o DNI
+def correo_marker(correo):
+    return f"correo#{correo}"
+
+
+def dni_marker(dni):
+    return f"dni#{dni}"
+
+
+def _is_marker(item):
+    return "owner_id" in item
+
+
+def backfill_markers():
+    """
+    Crea los marcadores de correo y DNI de los usuarios registrados antes de
+    que CrearUsuario los escribiera (scan completo). Se puede repetir. Los
+    correos o DNIs que ya usan dos cuentas se informan y quedan para revisión
+    manual: el marcador se asigna a la primera cuenta encontrada.
+    """
+    table = db.users_table()
+    client = db.ddb_client()
+    scan_kwargs = {
+        "ProjectionExpression": "user_id, correo, dni, owner_id"
+    }
+    created = 0
+    conflicts = []
+    while True:
+        resp = table.scan(**scan_kwargs)
+        for user in resp.get("Items", []):
+            if _is_marker(user):
+                continue
+            for field, marker in (("correo", correo_marker), ("dni", dni_marker)):
+                if not user.get(field):
+                    continue
+                key = marker(user[field])
+                try:
+                    table.put_item(
+                        Item={"user_id": key, "owner_id": user["user_id"]},
+                        ConditionExpression="attribute_not_exists(user_id)"
+                    )
+                    created += 1
+                except client.exceptions.ConditionalCheckFailedException:
+                    owner = table.get_item(Key={"user_id": key}, ConsistentRead=True).get("Item") or {}
+                    if owner.get("owner_id") != user["user_id"]:
+                        conflicts.append((key, owner.get("owner_id"), user["user_id"]))
+        if "LastEvaluatedKey" not in resp:
+            break
+        scan_kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+    print(f"✓ {created} marcadores creados")
+    for key, owner_id, user_id in conflicts:
+        print(f"⚠ {key} ya pertenece a {owner_id}; también lo usa {user_id}")
+    return created, conflicts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Usuarios")
+    parser.add_argument("--backfill-markers", action="store_true",
+                        help="crear los marcadores de correo/DNI de los usuarios existentes")
+    args = parser.parse_args()
+
+    if args.backfill_markers:
+        backfill_markers()
@@ -1,13 +1,179 @@
-# utils.py
+import os
 import json
+import gzip
+import base64
+from decimal import Decimal
 
-def response(status, body):
-    return {
+try:
+    # Backend opcional más rápido; si no está instalado se usa json
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies más chicos que esto se envían sin comprimir (no compensa el CPU)
+COMPRESSION_MIN_BYTES = int(os.environ.get("COMPRESSION_MIN_BYTES", "1024"))
+# Deben coincidir con apiGateway.binaryMediaTypes de serverless.yml: API
+# Gateway solo decodifica un body en base64 si el Accept del request coincide
+BINARY_MEDIA_TYPES = {"application/json"}
+
+
+def get_header(event, name):
+    # API Gateway no normaliza las mayúsculas de los headers
+    headers = (event or {}).get("headers") or {}
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def parse_body(event):
+    """
+    Body JSON del request. Con binaryMediaTypes activado API Gateway
+    puede enviarlo en base64.
+    """
+    body = event.get("body")
+    if not body:
+        return {}
+    if event.get("isBase64Encoded"):
+        body = base64.b64decode(body).decode("utf-8")
+    if isinstance(body, str):
+        body = json.loads(body)
+    return body
+
+
+def _accepted_encodings(event):
+    accepted = set()
+    for part in (get_header(event, "Accept-Encoding") or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name and q > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def _accepts_binary(event):
+    # "*/*" no cuenta: API Gateway devolvería el base64 tal cual
+    accept = get_header(event, "Accept") or ""
+    return any(part.split(";")[0].strip().lower() in BINARY_MEDIA_TYPES for part in accept.split(","))
+
+
+def _compress(data, event):
+    if not _accepts_binary(event):
+        return None, data
+    accepted = _accepted_encodings(event)
+    if brotli is not None and "br" in accepted:
+        return "br", brotli.compress(data, quality=5)
+    if "gzip" in accepted:
+        return "gzip", gzip.compress(data, compresslevel=6)
+    return None, data
+
+
+def response(status, body, headers=None, event=None):
+    """
+    Respuesta para API Gateway. Si se pasa el `event`, el cliente acepta
+    br/gzip y pide Accept: application/json, los bodies grandes se comprimen
+    y se envían en base64.
+    """
+    base_headers = {
+        "Content-Type": "application/json",
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,If-None-Match",
+        "Access-Control-Allow-Methods": "OPTIONS,POST,GET,PUT,DELETE",
+        "Access-Control-Expose-Headers": "ETag"
+    }
+    if headers:
+        base_headers.update(headers)
+
+    # 304 Not Modified no lleva body
+    payload = "" if body is None else dumps(body)
+    result = {
         "statusCode": status,
-        "headers": {
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token",
-            "Access-Control-Allow-Methods": "OPTIONS,POST,GET,PUT,DELETE"
-        },
-        "body": json.dumps(body)
+        "headers": base_headers,
+        "body": payload
     }
+
+    if event is not None and len(payload) >= COMPRESSION_MIN_BYTES:
+        encoding, data = _compress(payload.encode("utf-8"), event)
+        if encoding:
+            base_headers["Content-Encoding"] = encoding
+            base_headers["Vary"] = "Accept-Encoding"
+            result["body"] = base64.b64encode(data).decode("ascii")
+            result["isBase64Encoded"] = True
+    return result
+
+
+def json_default(obj):
+    # DynamoDB devuelve los números como Decimal y los sets como set
+    if isinstance(obj, Decimal):
+        if obj % 1 == 0:
+            return int(obj)
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+
+def dumps(obj):
+    """
+    Serializa items de DynamoDB directamente (sin copiar el árbol para
+    convertir los Decimal): el encoder solo llama a json_default para los
+    valores que no sabe serializar.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=json_default).decode()
+    return json.dumps(obj, default=json_default, ensure_ascii=False)
+
+
+def encode_cursor(last_evaluated_key):
+    """
+    Convierte el LastEvaluatedKey de DynamoDB en un token opaco para el cliente.
+    """
+    if not last_evaluated_key:
+        return None
+    raw = json.dumps(last_evaluated_key, default=json_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """
+    Convierte un token generado por encode_cursor de vuelta en ExclusiveStartKey.
+    Lanza ValueError si el token no es válido.
+    """
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError("next_token inválido")
+    if not isinstance(key, dict) or not key:
+        raise ValueError("next_token inválido")
+    return key
+
+
+def parse_limit(value, default, maximum):
+    """
+    Valida el parámetro ?limit= de los endpoints paginados.
+    Lanza ValueError si no es un entero positivo.
+    """
+    if value in (None, ""):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit debe ser un número entero")
+    if limit <= 0:
+        raise ValueError("limit debe ser mayor que 0")
+    return min(limit, maximum)
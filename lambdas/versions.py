@@ -0,0 +1,127 @@
+import os
+import time
+import hashlib
+from lambdas import db, scatter, metrics
+from lambdas.utils import get_header
+
+# Contadores de versión por alcance ("all", "floor#3", "urgency#critical",
+# "student#<id>"). Los handlers de escritura los incrementan y los de lectura
+# los usan como validador (ETag) sin leer los incidentes.
+
+BUMP_ATTEMPTS = 3
+BUMP_BACKOFF_SECONDS = 0.05
+# Margen para que los GSI reflejen una escritura: mientras tanto no hay ETag
+VERSION_SETTLE_SECONDS = float(os.environ.get("VERSION_SETTLE_SECONDS", "3"))
+
+
+def _floor_key(floor):
+    try:
+        return str(int(floor))
+    except (TypeError, ValueError):
+        return str(floor)
+
+
+def scopes_for(incident):
+    """
+    Alcances cuyas listas cambian cuando cambia este incidente.
+    """
+    scopes = ["all"]
+    if incident.get("created_by"):
+        scopes.append(f"student#{incident['created_by']}")
+    if incident.get("floor") is not None:
+        scopes.append(f"floor#{_floor_key(incident['floor'])}")
+    if incident.get("urgency"):
+        scopes.append(f"urgency#{incident['urgency']}")
+    return scopes
+
+
+def _bump_one(scope):
+    # Un update_item por alcance: ADD sobre un solo item no compite con otras
+    # transacciones (version#all lo tocan todas las escrituras)
+    table = db.meta_table()
+    for attempt in range(BUMP_ATTEMPTS):
+        try:
+            table.update_item(
+                Key={"pk": f"version#{scope}"},
+                UpdateExpression="ADD ver :one SET bumped_at = :now",
+                ExpressionAttributeValues={":one": 1, ":now": int(time.time() * 1000)}
+            )
+            return None
+        except Exception as e:
+            if attempt == BUMP_ATTEMPTS - 1:
+                return e
+            time.sleep(BUMP_BACKOFF_SECONDS * (2 ** attempt))
+
+
+def bump(scopes):
+    """
+    Incrementa las versiones de los alcances, en paralelo y con reintentos.
+    Se llama después de escribir el incidente: un lector que vea la versión
+    nueva siempre verá también el dato nuevo. La escritura ya quedó hecha,
+    así que un alcance que no se pudo actualizar no hace fallar la
+    solicitud: solo se registra (log y métrica VersionBumpFailures) y su ETag
+    sigue valiendo hasta el próximo bump. Devuelve los alcances fallidos.
+    """
+    scopes = list(dict.fromkeys(scopes))
+    if not scopes:
+        return []
+    errors = {
+        scope: error
+        for scope, error in zip(scopes, scatter.run_parallel(_bump_one, scopes))
+        if error is not None
+    }
+    if errors:
+        print(f"❌ No se pudieron actualizar las versiones {sorted(errors)}: {list(errors.values())[0]}")
+        metrics.emit("VersionBumpFailures", len(errors))
+    return sorted(errors)
+
+
+def current(scope):
+    """
+    (versión, bumped_at en ms) del alcance.
+    """
+    resp = db.meta_table().get_item(
+        Key={"pk": f"version#{scope}"},
+        ConsistentRead=True,
+        ProjectionExpression="ver, bumped_at"
+    )
+    item = resp.get("Item", {})
+    return int(item.get("ver", 0)), int(item.get("bumped_at", 0))
+
+
+def validator(scope, params=None):
+    """
+    ETag de la lista del alcance. Es barato: solo lee el contador de versión,
+    no los incidentes. None si la versión cambió hace menos de
+    VERSION_SETTLE_SECONDS: las listas salen de GSIs y scans eventualmente
+    consistentes, y un body leído en ese margen podría ser anterior a la
+    escritura. Sin ETag ese body no queda fijado por 304 ni en la caché.
+    """
+    version, bumped_at = current(scope)
+    if time.time() * 1000 - bumped_at < VERSION_SETTLE_SECONDS * 1000:
+        return None
+    return etag(scope, version, params)
+
+
+def etag(scope, version, params=None):
+    # El ETag depende también de los parámetros (limit, fields, next_token...)
+    raw = f"{scope}:{version}:" + "&".join(
+        f"{k}={v}" for k, v in sorted((params or {}).items()) if v is not None
+    )
+    return 'W/"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def not_modified(event, tag):
+    if tag is None:
+        return False
+    value = get_header(event, "If-None-Match")
+    if not value:
+        return False
+    return tag in [v.strip() for v in value.split(",")] or value.strip() == "*"
+
+
+def cache_headers(tag):
+    # no-cache: el navegador guarda la respuesta pero revalida con If-None-Match
+    if tag is None:
+        return {"Cache-Control": "no-cache"}
+    return {"ETag": tag, "Cache-Control": "no-cache"}